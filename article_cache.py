@@ -0,0 +1,61 @@
+import hashlib
+import os
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from sqlite_lru import SQLiteLRUCache
+from summary_cache import CACHE_DIR
+
+ARTICLE_CACHE_PATH = os.path.join(CACHE_DIR, "articles.sqlite3")
+ARTICLE_CACHE_MAX_BYTES = 128 * 1024 * 1024
+# Query parameters that only track where a click came from
+TRACKING_PREFIXES = ("utm_",)
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "cmpid"}
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url):
+    # Links to the same page from a newsletter, Facebook or the site itself
+    # should share one entry: lowercase scheme and host, no default port,
+    # fragment or tracking parameters, remaining parameters sorted
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not (k.lower().startswith(TRACKING_PREFIXES) or k.lower() in TRACKING_PARAMS))
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def url_key(url):
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+class ArticleCache(SQLiteLRUCache):
+    # SQLite store of downloaded pages: raw HTML with its ETag and
+    # Last-Modified validators, plus the title and text newspaper parsed from
+    # it. Least recently used pages go first once max_bytes is exceeded.
+    TABLE = "pages"
+    COLUMNS = ("url TEXT NOT NULL", "html BLOB NOT NULL", "encoding TEXT", "etag TEXT", "last_modified TEXT",
+               "lang TEXT", "title TEXT", "text TEXT", "fetched_at REAL NOT NULL")
+    COUNTERS = ("hits", "revalidated", "misses")
+
+    def __init__(self, path=ARTICLE_CACHE_PATH, max_bytes=ARTICLE_CACHE_MAX_BYTES):
+        super().__init__(path, max_bytes)
+
+    def get(self, url):
+        # The stored page as a dict, or None
+        with self._lock, self._conn:
+            row = self._get_row(url_key(url))
+            return None if row is None else dict(row)
+
+    def put(self, url, html, encoding, etag, last_modified, lang, title, text):
+        data = html.encode(encoding or "utf-8") if isinstance(html, str) else html
+        self._put_row({"key": url_key(url), "url": normalize_url(url), "html": data, "encoding": encoding,
+                       "etag": etag, "last_modified": last_modified, "lang": lang, "title": title, "text": text,
+                       "size": len(data) + len((text or "").encode("utf-8")), "fetched_at": time.time()})
+
+    def revalidated(self, url):
+        # The server answered 304: the stored copy counts as freshly fetched
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE pages SET fetched_at = ? WHERE key = ?", (time.time(), url_key(url)))
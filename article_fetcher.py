@@ -0,0 +1,265 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlparse
+from article_cache import ArticleCache
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) tcb-photocard-generator"
+# (connect, read) seconds per request
+FETCH_TIMEOUT = (5, 20)
+FETCH_WORKERS = 8
+# Concurrent requests to any one site, to stay polite and avoid rate limits
+PER_HOST_LIMIT = 2
+PARSE_WORKERS = min(4, os.cpu_count() or 1)
+FETCH_RETRIES = 2
+# Cached pages younger than this are used without asking the server; older
+# ones are revalidated with a conditional request
+ARTICLE_FRESH_SECONDS = 30 * 60
+# Offline mode serves cached pages only and never touches the network
+OFFLINE = os.environ.get("TCB_OFFLINE", "") not in ("", "0")
+
+
+class NotCachedError(LookupError):
+    pass
+
+
+def parse_article(url, html, lang="en"):
+    # Parse already-downloaded HTML. Images are not fetched: newspaper would
+    # otherwise download candidates to pick a top image we never use.
+    from newspaper import Article
+    article = Article(url, language=lang, fetch_images=False)
+    article.download(input_html=html)
+    article.parse()
+    return article.title.strip(), article.text.strip()
+
+
+class ArticleFetcher:
+    # Downloads pages over one pooled keep-alive session, several at a time
+    # but at most per_host_limit per site, and parses them on a separate
+    # pool so a slow parse never holds a connection. Downloads beyond a
+    # site's limit wait in that site's queue rather than in a pool thread,
+    # so they never hold up other sites. With a cache, fresh pages skip
+    # both the network and the parse, and stale ones are revalidated with
+    # If-None-Match / If-Modified-Since.
+    def __init__(self, session=None, workers=FETCH_WORKERS, per_host_limit=PER_HOST_LIMIT,
+                 parse_workers=PARSE_WORKERS, timeout=FETCH_TIMEOUT, cache=None, offline=OFFLINE,
+                 fresh_seconds=ARTICLE_FRESH_SECONDS):
+        self._session = session
+        self._session_lock = threading.Lock()
+        self.workers = workers
+        self.timeout = timeout
+        self.per_host_limit = per_host_limit
+        self.cache = cache
+        self.offline = offline
+        self.fresh_seconds = fresh_seconds
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+        self._fetch_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch")
+        self._parse_pool = ThreadPoolExecutor(max_workers=parse_workers, thread_name_prefix="parse")
+
+    @property
+    def session(self):
+        # Built on first download, so offline runs need no requests import
+        with self._session_lock:
+            if self._session is None:
+                self._session = self._make_session(self.workers)
+            return self._session
+
+    @staticmethod
+    def _make_session(workers):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        session = requests.Session()
+        session.headers["User-Agent"] = USER_AGENT
+        # Connection failures and overload statuses are retried; a read timeout
+        # is not, or one slow site would cost several full timeouts
+        retry = Retry(total=FETCH_RETRIES, read=0, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _start_download(self, url, page, done):
+        # Run _download on the fetch pool once the site has a free slot;
+        # done(future) is called when it finishes
+        host = urlparse(url).hostname or ""
+        with self._hosts_lock:
+            state = self._hosts.setdefault(host, {"active": 0, "waiting": deque()})
+            if state["active"] >= self.per_host_limit:
+                state["waiting"].append((url, page, done))
+                return
+            state["active"] += 1
+        self._run_download(host, url, page, done)
+
+    def _run_download(self, host, url, page, done):
+        def finished(future):
+            self._release_host(host)
+            done(future)
+
+        self._fetch_pool.submit(self._download, url, page).add_done_callback(finished)
+
+    def _release_host(self, host):
+        # Hand the slot straight to the site's next waiting download
+        with self._hosts_lock:
+            state = self._hosts[host]
+            if not state["waiting"]:
+                state["active"] -= 1
+                return
+            url, page, done = state["waiting"].popleft()
+        self._run_download(host, url, page, done)
+
+    def fetch(self, url, cached=None):
+        # The response, or None when the server confirms the cached copy
+        # with 304 Not Modified
+        headers = {}
+        if cached is not None:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+        response = self.session.get(url, timeout=self.timeout, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            return None
+        response.raise_for_status()
+        return response
+
+    def _cache_call(self, method, *args):
+        # A broken cache only costs speed
+        if self.cache is None:
+            return None
+        try:
+            return getattr(self.cache, method)(*args)
+        except sqlite3.Error as e:
+            print(f"Article cache failed: {e}")
+            return None
+
+    def _lookup(self, url, lang):
+        # Runs on the fetch pool. Returns (page, fresh): the cached page dict
+        # or None, and whether it can be used without asking the server.
+        # "parsed" is set when the cached title and text can be used as they
+        # are.
+        cached = self._cache_call("get", url)
+        page = None
+        if cached is not None:
+            html = cached["html"].decode(cached["encoding"]) if cached["encoding"] else cached["html"]
+            page = dict(cached, html=html, parsed=None)
+            if cached["lang"] == lang and cached["text"] is not None:
+                page["parsed"] = (cached["title"], cached["text"])
+            if self.offline or time.time() - cached["fetched_at"] < self.fresh_seconds:
+                self._cache_call("count", "hits")
+                return page, True
+        if self.offline:
+            raise NotCachedError(f"Offline and not cached: {url}")
+        return page, False
+
+    def _download(self, url, page):
+        # Runs on the fetch pool inside a host slot; page is the cached copy
+        # to revalidate, if any
+        response = self.fetch(url, page)
+        if response is None:
+            self._cache_call("revalidated", url)
+            self._cache_call("count", "revalidated")
+            return page
+        self._cache_call("count", "misses")
+        # Without a declared charset requests guesses Latin-1; hand newspaper
+        # the bytes so it can read the page's own meta charset instead
+        encoding = response.encoding if "charset" in response.headers.get("Content-Type", "").lower() else None
+        return {"html": response.text if encoding else response.content, "encoding": encoding,
+                "etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified"),
+                "parsed": None}
+
+    def submit(self, url, lang="en"):
+        # Future of (title, text): looked up in the cache and, unless fresh,
+        # downloaded on the fetch pool, then parsed on the parse pool unless
+        # the cache already had the parse
+        result = Future()
+
+        def parse(page):
+            title, text = parse_article(url, page["html"], lang)
+            self._cache_call("put", url, page["html"], page["encoding"], page["etag"], page["last_modified"],
+                             lang, title, text)
+            return title, text
+
+        def parsed(future):
+            if future.exception() is not None:
+                result.set_exception(future.exception())
+            else:
+                result.set_result(future.result())
+
+        def use(page):
+            if page["parsed"] is not None:
+                result.set_result(page["parsed"])
+                return
+            self._parse_pool.submit(parse, page).add_done_callback(parsed)
+
+        def loaded(future):
+            if future.exception() is not None:
+                result.set_exception(future.exception())
+            else:
+                use(future.result())
+
+        def looked_up(future):
+            if future.exception() is not None:
+                result.set_exception(future.exception())
+                return
+            page, fresh = future.result()
+            if fresh:
+                use(page)
+            else:
+                self._start_download(url, page, loaded)
+
+        self._fetch_pool.submit(self._lookup, url, lang).add_done_callback(looked_up)
+        return result
+
+    def extract(self, url, lang="en"):
+        return self.submit(url, lang).result()
+
+    def extract_many(self, urls, lang="en"):
+        # (title, text) or the exception raised, per URL in input order
+        futures = [self.submit(url, lang) for url in urls]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def close(self):
+        self._fetch_pool.shutdown(wait=False)
+        self._parse_pool.shutdown(wait=False)
+        if self._session is not None:
+            self._session.close()
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def _open_article_cache():
+    try:
+        return ArticleCache()
+    except (OSError, sqlite3.Error) as e:
+        print(f"Article cache disabled: {e}")
+        return None
+
+
+def get_fetcher():
+    # One shared fetcher per process, so connections are reused across calls
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = ArticleFetcher(cache=_open_article_cache())
+        return _fetcher
+
+
+def extract_article(url, lang="en"):
+    return get_fetcher().extract(url, lang)
+
+
+def extract_articles(urls, lang="en"):
+    return get_fetcher().extract_many(urls, lang)
@@ -0,0 +1,91 @@
+import json
+import os
+import re
+from functools import lru_cache
+from urllib.parse import urlparse
+
+BOILERPLATE_RULES_PATH = os.environ.get(
+    "TCB_BOILERPLATE_RULES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "boilerplate_rules.json"))
+MIN_PARAGRAPH_WORDS = 6
+# Lines ending like a sentence are kept however short they are
+_SENTENCE_END = re.compile(r'[.!?]["\'”’)]?$')
+
+
+@lru_cache(maxsize=4)
+def _load_rules(path, mtime):
+    # Keyed on mtime so an edited rule file is picked up without a restart
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    compile_all = lambda patterns: [re.compile(p, re.IGNORECASE) for p in patterns]
+    return {
+        "min_paragraph_words": raw.get("min_paragraph_words", MIN_PARAGRAPH_WORDS),
+        "patterns": compile_all(raw.get("patterns", [])),
+        "sites": {host.lower(): compile_all(patterns) for host, patterns in raw.get("sites", {}).items()},
+    }
+
+
+def load_rules(path=BOILERPLATE_RULES_PATH):
+    try:
+        return _load_rules(path, os.path.getmtime(path))
+    except (OSError, ValueError, re.error) as e:
+        print(f"Boilerplate rules not loaded: {e}")
+        return {"min_paragraph_words": MIN_PARAGRAPH_WORDS, "patterns": [], "sites": {}}
+
+
+def _site_patterns(rules, url):
+    host = (urlparse(url).hostname or "").lower() if url else ""
+    # A rule for example.com also covers www.example.com and other subdomains
+    return [p for site, patterns in rules["sites"].items()
+            if host == site or host.endswith("." + site) for p in patterns]
+
+
+def _count_tokens(text):
+    # Exact when the summarization model is already loaded, otherwise an
+    # estimate, so pruning never loads the model by itself
+    import summarizer
+    if summarizer.is_summarizer_ready():
+        return summarizer.count_tokens(text), False
+    return round(len(text.split()) * summarizer.TOKENS_PER_WORD), True
+
+
+def prune_boilerplate(text, url=None, rules=None):
+    # Drop lines matching the rule file's patterns (general and per site),
+    # repeats of earlier lines, and short lines that do not read as a
+    # sentence (credits, "Read more", stray headings). Returns the cleaned
+    # text and a stats dict.
+    rules = rules or load_rules()
+    patterns = rules["patterns"] + _site_patterns(rules, url)
+    stats = {"patterns": 0, "repeated": 0, "short": 0}
+    seen = set()
+    kept = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            # Keep paragraph breaks, but only one in a row
+            if kept and kept[-1]:
+                kept.append("")
+            continue
+        key = re.sub(r'\s+', ' ', stripped).lower()
+        if any(p.search(stripped) for p in patterns):
+            stats["patterns"] += 1
+        elif key in seen:
+            stats["repeated"] += 1
+        elif len(stripped.split()) < rules["min_paragraph_words"] and not _SENTENCE_END.search(stripped):
+            stats["short"] += 1
+        else:
+            seen.add(key)
+            kept.append(stripped)
+    # Never hand the summarizer nothing because every line looked like noise
+    cleaned = "\n".join(kept).strip() or text.strip()
+
+    before, estimated = _count_tokens(text)
+    after = _count_tokens(cleaned)[0] if cleaned != text.strip() else before
+    stats.update(tokens_before=before, tokens_after=after, tokens_saved=before - after, estimated=estimated)
+    return cleaned, stats
+
+
+def pruning_message(stats):
+    removed = stats["patterns"] + stats["repeated"] + stats["short"]
+    approx = "~" if stats["estimated"] else ""
+    return (f"🧹 Pruned {removed} boilerplate line(s) ({stats['patterns']} by rule, {stats['repeated']} repeated, "
+            f"{stats['short']} short): {approx}{stats['tokens_saved']} of {approx}{stats['tokens_before']} tokens saved")
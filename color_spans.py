@@ -0,0 +1,68 @@
+from bisect import bisect_left, bisect_right
+
+DEFAULT_TEXT_COLOR = (255, 255, 255, 255)
+
+
+class ColorSpans:
+    # Piecewise-constant colour map over character offsets. _starts[i] is the
+    # offset where _colors[i] begins; it runs until the next start, and the last
+    # one runs to the end of any text. Offset 0 is always present and adjacent
+    # spans never share a colour, so painting keeps the map minimal in place.
+    def __init__(self, default=DEFAULT_TEXT_COLOR):
+        self.default = default
+        self._starts = [0]
+        self._colors = [default]
+
+    @classmethod
+    def from_ranges(cls, ranges, default=DEFAULT_TEXT_COLOR):
+        spans = cls(default)
+        for start, end, color in ranges:
+            spans.paint(start, end, color)
+        return spans
+
+    def copy(self):
+        spans = ColorSpans.__new__(ColorSpans)
+        spans.default = self.default
+        spans._starts = list(self._starts)
+        spans._colors = list(self._colors)
+        return spans
+
+    def key(self):
+        return tuple(zip(self._starts, self._colors))
+
+    def __len__(self):
+        return len(self._starts)
+
+    def color_at(self, index):
+        return self._colors[bisect_right(self._starts, index) - 1]
+
+    def paint(self, start, end, color):
+        if start >= end:
+            return
+        resume = self.color_at(end)
+        lo = bisect_left(self._starts, start)
+        hi = bisect_right(self._starts, end)
+        self._starts[lo:hi] = [start, end]
+        self._colors[lo:hi] = [color, resume]
+        self._coalesce(lo + 1)
+        self._coalesce(lo)
+
+    def _coalesce(self, i):
+        if 0 < i < len(self._starts) and self._colors[i] == self._colors[i - 1]:
+            del self._starts[i]
+            del self._colors[i]
+
+    def runs(self, start, end):
+        # Yields (run_start, run_end, color) covering [start, end)
+        i = bisect_right(self._starts, start) - 1
+        pos = start
+        while pos < end:
+            nxt = self._starts[i + 1] if i + 1 < len(self._starts) else end
+            run_end = min(nxt, end)
+            yield pos, run_end, self._colors[i]
+            pos = run_end
+            i += 1
+
+    def painted_runs(self, start, end):
+        # Like runs(), but only the parts painted a colour other than the default
+        return ((s, e, color) for s, e, color in self.runs(start, end) if color != self.default)
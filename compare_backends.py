@@ -0,0 +1,117 @@
+import glob
+import os
+import re
+import sys
+import time
+from collections import Counter
+import summarizer
+from inference_backends import BACKENDS, resident_memory
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "articles")
+REFERENCE_BACKEND = "pytorch"
+
+
+def _words(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def _f1(overlap, candidate_len, reference_len):
+    if not overlap:
+        return 0.0
+    precision = overlap / candidate_len
+    recall = overlap / reference_len
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_1(candidate, reference):
+    cand, ref = _words(candidate), _words(reference)
+    overlap = sum((Counter(cand) & Counter(ref)).values())
+    return _f1(overlap, len(cand), len(ref))
+
+
+def rouge_l(candidate, reference):
+    cand, ref = _words(candidate), _words(reference)
+    # Longest common subsequence, one row at a time
+    prev = [0] * (len(ref) + 1)
+    for word in cand:
+        row = [0]
+        for j, other in enumerate(ref):
+            row.append(prev[j] + 1 if word == other else max(prev[j + 1], row[j]))
+        prev = row
+    return _f1(prev[-1], len(cand), len(ref))
+
+
+def _mb(n):
+    return f"{n / (1024 * 1024):.0f} MB" if n else "n/a"
+
+
+def run_backend(backend, articles):
+    summarizer.set_backend(backend)
+    start = time.perf_counter()
+    summarizer.get_summarizer()
+    load_time = time.perf_counter() - start
+    current, _ = resident_memory()
+
+    summaries = {}
+    latencies = []
+    for name, text in articles:
+        start = time.perf_counter()
+        summaries[name] = summarizer.summarize_document(text, max_length=150, min_length=40,
+                                                        method="abstractive", use_cache=False, use_daemon=False)
+        latencies.append(time.perf_counter() - start)
+    _, peak = resident_memory()
+    return {"load": load_time, "memory": current, "peak": peak,
+            "latency": sum(latencies) / len(latencies), "summaries": summaries}
+
+
+def main():
+    # Summarize every fixture article with each backend (reference first) and
+    # report load time, memory, latency and ROUGE against the fp32 output.
+    # Run as: python compare_backends.py [backend ...] [--fixtures DIR]
+    args = sys.argv[1:]
+    fixture_dir = FIXTURE_DIR
+    if "--fixtures" in args:
+        i = args.index("--fixtures")
+        fixture_dir = args[i + 1]
+        del args[i:i + 2]
+    backends = args or list(BACKENDS)
+    for backend in backends:
+        if backend not in BACKENDS:
+            print(f"❌ Unknown backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+            sys.exit(1)
+    if REFERENCE_BACKEND not in backends:
+        backends.insert(0, REFERENCE_BACKEND)
+    backends.sort(key=lambda b: b != REFERENCE_BACKEND)
+
+    articles = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            articles.append((os.path.basename(path), f.read()))
+    if not articles:
+        print(f"❌ No fixture articles in {fixture_dir}")
+        sys.exit(1)
+
+    # Each backend is measured in turn within this process, so peak memory is
+    # cumulative; run one backend per process for isolated numbers
+    results = {}
+    for backend in backends:
+        print(f"⏳ {backend}...")
+        try:
+            results[backend] = run_backend(backend, articles)
+        except Exception as e:
+            print(f"⚠️ {backend} failed: {e}")
+
+    reference = results.get(REFERENCE_BACKEND)
+    if reference is None:
+        sys.exit(1)
+    print(f"\n{'backend':<10} {'load':>8} {'memory':>9} {'peak':>9} {'latency':>9} {'ROUGE-1':>8} {'ROUGE-L':>8}")
+    for backend, r in results.items():
+        pairs = [(r["summaries"][name], reference["summaries"][name]) for name, _ in articles]
+        r1 = sum(rouge_1(c, ref) for c, ref in pairs) / len(pairs)
+        rl = sum(rouge_l(c, ref) for c, ref in pairs) / len(pairs)
+        print(f"{backend:<10} {r['load']:>7.1f}s {_mb(r['memory']):>9} {_mb(r['peak']):>9} "
+              f"{r['latency']:>8.2f}s {r1:>8.3f} {rl:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
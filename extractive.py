@@ -0,0 +1,101 @@
+import re
+from functools import lru_cache
+import numpy as np
+
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6
+# Sentences this similar to one already picked are treated as repeats
+REDUNDANCY_THRESHOLD = 0.8
+
+_WORD = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)?")
+_FALLBACK_STOPWORDS = frozenset(
+    "a an and are as at be been but by for from had has have he her his i in is it its of on or "
+    "our she that the their them they this to was we were which who will with would you".split())
+
+
+@lru_cache(maxsize=1)
+def _stopwords():
+    # Local lookup only, like punkt
+    try:
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words("english"))
+    except (ImportError, LookupError):
+        return _FALLBACK_STOPWORDS
+
+
+@lru_cache(maxsize=1)
+def _stemmer():
+    try:
+        from nltk.stem import PorterStemmer
+        return PorterStemmer().stem
+    except ImportError:
+        return lambda word: word
+
+
+def _terms(sentence):
+    stop = _stopwords()
+    stem = _stemmer()
+    return [stem(w) for w in (m.group().lower() for m in _WORD.finditer(sentence)) if w not in stop]
+
+
+def tfidf_matrix(sentences):
+    # One L2-normalised TF-IDF row per sentence, each sentence a document
+    terms = [_terms(s) for s in sentences]
+    vocab = {t: i for i, t in enumerate(sorted({t for ts in terms for t in ts}))}
+    tf = np.zeros((len(sentences), len(vocab)))
+    for row, ts in enumerate(terms):
+        for t in ts:
+            tf[row, vocab[t]] += 1
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + df)) + 1
+    vectors = tf * idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def textrank(similarity):
+    # PageRank over the sentence similarity graph. Teleporting favours the
+    # opening sentences, where news stories put the key facts.
+    n = len(similarity)
+    weights = similarity.copy()
+    np.fill_diagonal(weights, 0)
+    out = weights.sum(axis=1, keepdims=True)
+    # Sentences with no neighbours spread their rank evenly
+    transition = np.divide(weights, out, out=np.full_like(weights, 1.0 / n), where=out > 0)
+    lead = 1.0 / np.sqrt(np.arange(1, n + 1))
+    lead /= lead.sum()
+    scores = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) * lead + DAMPING * transition.T @ scores
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def extractive_summary(sentences, max_words):
+    # Highest-ranked sentences that fit in max_words, in article order. A
+    # sentence that would overflow is skipped rather than ending the
+    # selection, so a shorter one further down can still fit; the top
+    # sentence is always kept.
+    sentences = [s.strip() for s in sentences if s.strip()]
+    if len(sentences) <= 1:
+        return " ".join(sentences)
+    vectors = tfidf_matrix(sentences)
+    similarity = vectors @ vectors.T
+    scores = textrank(similarity)
+    lengths = [len(s.split()) for s in sentences]
+
+    chosen = []
+    words = 0
+    for i in np.argsort(-scores, kind="stable"):
+        if chosen and words + lengths[i] > max_words:
+            continue
+        if any(similarity[i, j] > REDUNDANCY_THRESHOLD for j in chosen):
+            continue
+        chosen.append(i)
+        words += lengths[i]
+        if words >= max_words:
+            break
+    return " ".join(sentences[i] for i in sorted(chosen))
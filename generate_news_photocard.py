@@ -1,82 +1,47 @@
-from newspaper import Article
-from transformers import pipeline
-from PIL import Image, ImageDraw, ImageFont
-import textwrap
-import nltk
+from PIL import Image, ImageDraw
+from text_layout import get_font, wrap_text
 import datetime
 import os
 import sys
-
-nltk.download('punkt', quiet=True)
+from article_fetcher import extract_article, get_fetcher
+from boilerplate import prune_boilerplate, pruning_message
+from pipeline import Pipeline, Stage, format_stats
+from summarizer import get_summary_cache, preload_summarizer, summarize_document
 
 # Paths
 BACKGROUND_IMAGE = "tcb-template.png"
 OUTPUT_IMAGE_PATH = os.path.expanduser("~/Pictures/tcb_photocard_output.png")
 FONT_PATH = "TiroBangla.ttf"  # Make sure this font file exists in your dir or give full path
+# Downloads in flight and card renders running side by side; summaries run
+# one at a time on a single worker so they never compete for the CPU
+FETCH_STAGE_WORKERS = 4
+RENDER_PROCESSES = 2
 
 # === STEP 1 & 2: Article Extraction and Summarization ===
-def extract_article(url, lang='en'):
-    article = Article(url, language=lang)
-    article.download()
-    article.parse()
-    return article.title.strip(), article.text.strip()
-
-def summarize_text(text):
-    summarizer = pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
-    max_chunk_tokens = 1000
-    chunks = []
-    words = text.split()
-    chunk = []
-    length = 0
-    for word in words:
-        length += len(word) + 1
-        chunk.append(word)
-        if length > max_chunk_tokens:
-            chunks.append(" ".join(chunk))
-            chunk = []
-            length = 0
-    if chunk:
-        chunks.append(" ".join(chunk))
-
-    final_summary = []
-    print(f"\n🔍 Total chunks: {len(chunks)}")
-    for i, chunk_text in enumerate(chunks):
-        print(f"🧠 Summarizing chunk {i+1}/{len(chunks)}...")
-        try:
-            out = summarizer(chunk_text, max_length=150, min_length=40, do_sample=False)
-            final_summary.append(out[0]['summary_text'])
-        except Exception as e:
-            print(f"⚠️ Error summarizing chunk {i+1}: {e}")
-    return " ".join(final_summary)
+def summarize_text(text, log=print):
+    return summarize_document(text, max_length=150, min_length=40, log=log,
+                              on_error=lambda i, e: log(f"⚠️ Error summarizing chunk {i+1}: {e}"))
 
 # === STEP 3: Photocard Generation ===
 def generate_photocard(title, subtitle, background_image_path, output_path, font_path):
     image = Image.open(background_image_path).convert("RGBA")
     draw = ImageDraw.Draw(image)
     font_size = 32
-    font = ImageFont.truetype(font_path, font_size)
+    font = get_font(font_path, font_size)
 
     x, y = 150, 880
     max_width = 880
     max_height = 300
 
-    lines = []
-    for line in title.split('\n'):
-        wrapped = textwrap.wrap(line, width=30)
-        lines.extend(wrapped if wrapped else [''])
-
-    line_height = font.getbbox('A')[3] - font.getbbox('A')[1] + 10
-    total_text_height = line_height * len(lines)
-    current_y = y + (max_height - total_text_height) // 2
+    layout = wrap_text(title, font, max_width, line_spacing_add=6)
+    current_y = y + (max_height - layout.height) // 2
 
-    for line in lines:
-        bbox = draw.textbbox((0, 0), line, font=font)
-        w = bbox[2] - bbox[0]
-        draw.text(((image.width - w) / 2, current_y), line, font=font, fill=(255, 255, 255, 255))
-        current_y += line_height
+    for line in layout.lines:
+        draw.text(((image.width - line.width) / 2, current_y), line.text, font=font, fill=(255, 255, 255, 255))
+        current_y += layout.line_height
 
     # Add date at bottom right
-    date_font = ImageFont.truetype(font_path, 24)
+    date_font = get_font(font_path, 24)
     date_str = datetime.datetime.now().strftime("%d %B, %Y").upper()
     date_bbox = draw.textbbox((0, 0), date_str, font=date_font)
     date_w = date_bbox[2] - date_bbox[0]
@@ -87,34 +52,88 @@ def generate_photocard(title, subtitle, background_image_path, output_path, font
     print(f"\n📸 Photocard saved to: {output_path}")
     return subtitle
 
+def output_paths(count):
+    # One URL keeps the usual file name; a bulletin gets numbered cards
+    if count == 1:
+        return [OUTPUT_IMAGE_PATH]
+    root, ext = os.path.splitext(OUTPUT_IMAGE_PATH)
+    return [f"{root}_{n:02d}{ext}" for n in range(1, count + 1)]
+
+# === Pipeline stages ===
+# Each takes and returns a card dict. render_card runs in a worker process,
+# so it stays a module-level function.
+def fetch_card(card):
+    label = f"[{card['number']}]"
+    card["title"], full_text = extract_article(card["url"], card["lang"])
+    print(f"\n{label} 📰 Extracted Title:\n{card['title']}")
+    print(f"\n{label} 📝 Article Sample:\n{full_text[:500]}...\n")
+    card["text"], pruned = prune_boilerplate(full_text, card["url"])
+    print(f"{label} {pruning_message(pruned)}")
+    return card
+
+def summarize_card(card):
+    label = f"[{card['number']}]"
+    print(f"{label} Summarizing article...")
+    card["subtitle"] = summarize_text(card.pop("text"), log=lambda message: print(f"{label} {message}"))
+    return card
+
+def render_card(card):
+    generate_photocard(card["title"], card["subtitle"], BACKGROUND_IMAGE, card["output_path"], FONT_PATH)
+    return card
+
+def card_pipeline():
+    return Pipeline([
+        Stage("fetch", fetch_card, workers=FETCH_STAGE_WORKERS),
+        Stage("summarize", summarize_card),
+        Stage("render", render_card, workers=RENDER_PROCESSES, processes=True),
+    ])
+
 # === MAIN ===
 def main():
+    # Load the model while the user is typing
+    preload_summarizer()
     lang = input("Language (en/bn): ").strip().lower()
-    url = input("Paste the news article URL: ").strip()
-
-    try:
-        print("\nExtracting article...")
-        title, full_text = extract_article(url, lang)
-        print(f"\n📰 Extracted Title:\n{title}")
-        print(f"\n📝 Article Sample:\n{full_text[:500]}...\n")
-
-        if lang == "bn":
-            print("⚠️ Bangla summarization not supported. Translate first.")
-
-        print("Summarizing article...")
-        subtitle = summarize_text(full_text)
-
-        print("\n=== Final Photocard Content ===")
-        print(f"📌 Title (English): {title}")
-        print(f"📝 Subtitle (English): {subtitle[:300]}...")
-
-        generate_photocard(title, subtitle, BACKGROUND_IMAGE, OUTPUT_IMAGE_PATH, FONT_PATH)
-
-        print("\n✅ All done. Copy the subtitle as Facebook caption. Paste full article in comment with source.")
+    # A whole bulletin can be pasted at once: while one card renders the next
+    # article is summarized and later ones are downloaded
+    urls = input("Paste the news article URL(s), separated by spaces: ").replace(",", " ").split()
+    if not urls:
+        print("❌ Error: no URL given")
+        sys.exit(1)
 
-    except Exception as e:
-        print(f"❌ Error: {e}")
+    if lang == "bn":
+        print("⚠️ Bangla summarization not supported. Translate first.")
+
+    cards = [{"number": n, "url": url, "lang": lang, "output_path": path}
+             for n, (url, path) in enumerate(zip(urls, output_paths(len(urls))), 1)]
+
+    def finished(n, card):
+        if isinstance(card, Exception):
+            print(f"\n❌ [{n + 1}] Error for {urls[n]}: {card}")
+            return
+        print(f"\n=== [{card['number']}] Final Photocard Content ===")
+        print(f"📌 Title (English): {card['title']}")
+        print(f"📝 Subtitle (English): {card['subtitle'][:300]}...")
+
+    print(f"\nProcessing {len(urls)} article(s)...")
+    pipeline = card_pipeline()
+    results = pipeline.run(cards, on_result=finished,
+                           on_stats=lambda stats: print(f"⏱️ {format_stats(stats)}"))
+    print(f"\n⏱️ {format_stats(pipeline.stats())}")
+
+    cache = get_summary_cache()
+    if cache is not None:
+        stats = cache.stats()
+        print(f"♻️ Summary cache: {stats['hits']} hit(s), {stats['misses']} miss(es), {stats['entries']} stored")
+    if get_fetcher().cache is not None:
+        stats = get_fetcher().cache.stats()
+        print(f"♻️ Article cache: {stats['hits']} hit(s), {stats['revalidated']} revalidated, "
+              f"{stats['misses']} download(s), {stats['entries']} stored")
+
+    failed = sum(isinstance(card, Exception) for card in results)
+    if failed:
+        print(f"\n❌ {failed} of {len(urls)} card(s) failed")
         sys.exit(1)
+    print("\n✅ All done. Copy the subtitle as Facebook caption. Paste full article in comment with source.")
 
 if __name__ == "__main__":
     main()
@@ -1,85 +1,61 @@
-import nltk
-from newspaper import Article
-from transformers import pipeline, AutoTokenizer
 import sys
-
-# Download tokenizer
-nltk.download('punkt', quiet=True)
-
-# Constants
-MODEL_NAME = "sshleifer/distilbart-cnn-12-6"
-MAX_INPUT_TOKENS = 1024
-CHUNK_TOKEN_LIMIT = 950  # Slight buffer under max
-
-# Load model and tokenizer once
-summarizer = pipeline("summarization", model=MODEL_NAME)
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-
-def extract_article(url, lang='en'):
-    article = Article(url, language=lang)
-    article.download()
-    article.parse()
-    return article.title, article.text
-
-def split_text_tokenwise(text):
-    sentences = nltk.sent_tokenize(text)
-    chunks = []
-    current_chunk = ""
-    current_tokens = 0
-
-    for sentence in sentences:
-        sentence_tokens = len(tokenizer.encode(sentence, add_special_tokens=False))
-        if current_tokens + sentence_tokens <= CHUNK_TOKEN_LIMIT:
-            current_chunk += " " + sentence
-            current_tokens += sentence_tokens
-        else:
-            chunks.append(current_chunk.strip())
-            current_chunk = sentence
-            current_tokens = sentence_tokens
-
-    if current_chunk:
-        chunks.append(current_chunk.strip())
-
-    return chunks
+from article_fetcher import extract_articles, get_fetcher
+from boilerplate import prune_boilerplate, pruning_message
+from summarizer import get_summary_cache, preload_summarizer, summarize_document
 
 def summarize_text(title, text):
-    chunks = split_text_tokenwise(text)
-    print(f"🔍 Total chunk(s): {len(chunks)}")
-
-    summaries = []
-    for i, chunk in enumerate(chunks):
-        print(f"🧠 Summarizing chunk {i+1}/{len(chunks)}")
-        try:
-            summary = summarizer(chunk, max_length=150, min_length=40, do_sample=False)[0]['summary_text']
-            summaries.append(summary)
-        except Exception as e:
-            print(f"⚠️ Error summarizing chunk {i+1}: {e}")
-            continue
-
-    combined_summary = " ".join(summaries)
+    combined_summary = summarize_document(text, max_length=150, min_length=40, log=print,
+                                          on_error=lambda i, e: print(f"⚠️ Error summarizing chunk {i+1}: {e}"))
     return title.strip(), combined_summary.strip()
 
 def main():
+    # Load the model while the user is typing
+    preload_summarizer()
     lang = input("Language (en/bn): ").strip().lower()
-    url = input("Paste the news article URL: ").strip()
+    # A morning's list of links can be pasted at once; they are all fetched
+    # concurrently before the first one is summarized
+    urls = input("Paste the news article URL(s), separated by spaces: ").replace(",", " ").split()
+    if not urls:
+        print("\n❌ Error: no URL given")
+        sys.exit(1)
+
+    print(f"\nFetching {len(urls)} article(s)...")
+    failed = 0
+    for url, result in zip(urls, extract_articles(urls, lang)):
+        print(f"\n🔗 {url}")
+        try:
+            if isinstance(result, Exception):
+                raise result
+            title, full_text = result
+            print(f"\n📰 Extracted Title:\n{title}")
+            print(f"\n📝 Article Sample:\n{full_text[:300]}...\n")
 
-    try:
-        title, full_text = extract_article(url, lang)
-        print(f"\n📰 Extracted Title:\n{title}")
-        print(f"\n📝 Article Sample:\n{full_text[:300]}...\n")
+            if lang == "bn":
+                print("⚠️ Bangla summarization not supported! Translate first.")
 
-        if lang == "bn":
-            print("⚠️ Bangla summarization not supported! Translate first.")
+            article_text, pruned = prune_boilerplate(full_text, url)
+            print(pruning_message(pruned))
 
-        print("\nSummarizing article(s)...")
-        title, subtitle = summarize_text(title, full_text)
+            print("\nSummarizing article(s)...")
+            title, subtitle = summarize_text(title, article_text)
 
-        print("\n=== Final Photocard Content ===")
-        print(f"📌 Title (English): {title}")
-        print(f"📝 Subtitle (English): {subtitle}")
+            print("\n=== Final Photocard Content ===")
+            print(f"📌 Title (English): {title}")
+            print(f"📝 Subtitle (English): {subtitle}")
 
-    except Exception as e:
-        print(f"\n❌ Error: {e}")
+        except Exception as e:
+            print(f"\n❌ Error: {e}")
+            failed += 1
+
+    cache = get_summary_cache()
+    if cache is not None:
+        stats = cache.stats()
+        print(f"\n♻️ Summary cache: {stats['hits']} hit(s), {stats['misses']} miss(es), {stats['entries']} stored")
+    if get_fetcher().cache is not None:
+        stats = get_fetcher().cache.stats()
+        print(f"♻️ Article cache: {stats['hits']} hit(s), {stats['revalidated']} revalidated, "
+              f"{stats['misses']} download(s), {stats['entries']} stored")
+    if failed:
         sys.exit(1)
 
 if __name__ == "__main__":
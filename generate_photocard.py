@@ -1,5 +1,5 @@
-from PIL import Image, ImageDraw, ImageFont
-import textwrap
+from PIL import Image, ImageDraw
+from text_layout import get_font, wrap_text
 from datetime import datetime
 
 def generate_photocard(title, subtitle, background_image_path, output_path, font_path):
@@ -9,7 +9,7 @@ def generate_photocard(title, subtitle, background_image_path, output_path, font
 
     # Font settings
     font_size = 36
-    font = ImageFont.truetype(font_path, font_size)
+    font = get_font(font_path, font_size)
 
     # Title box
     x, y = 100, 950
@@ -17,27 +17,21 @@ def generate_photocard(title, subtitle, background_image_path, output_path, font
     max_height = 280
 
     # Wrap title
-    lines = []
-    for line in title.split('\n'):
-        wrapped = textwrap.wrap(line, width=30)
-        lines.extend(wrapped if wrapped else [''])
+    layout = wrap_text(title, font, max_width, line_spacing_add=6)
 
     # Title positioning
-    line_height = font.getbbox('A')[3] - font.getbbox('A')[1] + 10
-    total_text_height = line_height * len(lines)
-    current_y = y + (max_height - total_text_height) // 2
+    current_y = y + (max_height - layout.height) // 2
 
-    for line in lines:
-        w = font.getbbox(line)[2]
-        draw.text(((image.width - w) / 2, current_y), line, font=font, fill=(255, 255, 255, 255))
-        current_y += line_height
+    for line in layout.lines:
+        draw.text(((image.width - line.width) / 2, current_y), line.text, font=font, fill=(255, 255, 255, 255))
+        current_y += layout.line_height
 
     # 📆 Add current date at bottom right
     now = datetime.now()
     date_str = now.strftime("%d %B, %Y").upper()  # e.g., "11 JULY, 2025"
 
     # Load smaller font for date
-    date_font = ImageFont.truetype(font_path, 28)
+    date_font = get_font(font_path, 28)
     date_width, date_height = date_font.getbbox(date_str)[2:]
 
     margin = 40
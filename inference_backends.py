@@ -0,0 +1,127 @@
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+from functools import lru_cache
+from summary_cache import CACHE_DIR
+
+# "pytorch" is eager fp32; "quantized" applies int8 dynamic quantization to
+# the Linear layers; "onnx" runs an exported graph on ONNX Runtime (needs
+# `pip install optimum[onnxruntime]`). Pick one with TCB_SUMMARY_BACKEND.
+BACKENDS = ("pytorch", "quantized", "onnx")
+DEFAULT_BACKEND = os.environ.get("TCB_SUMMARY_BACKEND", "pytorch")
+ONNX_DIR = os.path.join(CACHE_DIR, "onnx")
+# Models load from the local Hugging Face cache only; set
+# TCB_ALLOW_MODEL_DOWNLOAD=1 to let a missing model be downloaded instead
+ALLOW_MODEL_DOWNLOAD = os.environ.get("TCB_ALLOW_MODEL_DOWNLOAD", "") not in ("", "0")
+
+
+class ModelNotCachedError(LookupError):
+    pass
+
+
+def _from_local(loader, name, **kwargs):
+    # Load from the local Hugging Face cache without touching the network
+    try:
+        return loader(name, local_files_only=True, **kwargs)
+    except OSError as e:
+        if not ALLOW_MODEL_DOWNLOAD:
+            raise ModelNotCachedError(
+                f"{name} is not in the local Hugging Face cache. Download it once with "
+                f"`huggingface-cli download {name}` (or the snippet in the README), "
+                f"or set TCB_ALLOW_MODEL_DOWNLOAD=1 to fetch it on first use.") from e
+        print(f"{name} is not in the local cache; downloading it once.")
+        return loader(name, **kwargs)
+
+
+def _onnx_export_complete(path):
+    # A finished export has its config and at least one graph
+    return (os.path.isfile(os.path.join(path, "config.json"))
+            and any(name.endswith(".onnx") for name in os.listdir(path)))
+
+
+def _load_onnx_model(model_name):
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    path = os.path.join(ONNX_DIR, model_name.replace("/", "--"))
+    if os.path.isdir(path):
+        if _onnx_export_complete(path):
+            return ORTModelForSeq2SeqLM.from_pretrained(path)
+        # Left behind by an export that did not finish
+        shutil.rmtree(path, ignore_errors=True)
+    # First use: export the PyTorch weights to ONNX and keep the graph. The
+    # export is written to a temporary directory and renamed into place
+    # only once complete, so an interrupted one is redone next time.
+    model = _from_local(ORTModelForSeq2SeqLM.from_pretrained, model_name, export=True)
+    os.makedirs(ONNX_DIR, exist_ok=True)
+    partial = tempfile.mkdtemp(prefix=".export-", dir=ONNX_DIR)
+    try:
+        model.save_pretrained(partial)
+        os.replace(partial, path)
+    except OSError:
+        # Another process finished the same export first
+        if not (os.path.isdir(path) and _onnx_export_complete(path)):
+            raise
+    finally:
+        shutil.rmtree(partial, ignore_errors=True)
+    return model
+
+
+@lru_cache(maxsize=4)
+def load_tokenizer(model_name):
+    # A tokenizer of its own, kept for the life of the process: counting and
+    # chunking tokens never loads (or reloads) the model itself
+    from transformers import AutoTokenizer
+    return _from_local(AutoTokenizer.from_pretrained, model_name)
+
+
+def _model_load_kwargs():
+    # Weights are memory-mapped from the local cache (safetensors) and
+    # materialised once instead of via a randomly initialised copy. Older
+    # transformers refuse low_cpu_mem_usage without accelerate, which is
+    # optional, so the flag is only passed when it is installed.
+    if importlib.util.find_spec("accelerate") is None:
+        return {}
+    return {"low_cpu_mem_usage": True}
+
+
+def load_pipeline(model_name, backend=DEFAULT_BACKEND):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown summarizer backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+    from transformers import AutoTokenizer, pipeline
+    tokenizer = _from_local(AutoTokenizer.from_pretrained, model_name)
+    if backend == "onnx":
+        model = _load_onnx_model(model_name)
+    else:
+        from transformers import AutoModelForSeq2SeqLM
+        model = _from_local(AutoModelForSeq2SeqLM.from_pretrained, model_name, **_model_load_kwargs())
+        if backend == "quantized":
+            import torch
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+
+def resident_memory():
+    # (current, peak) resident set size in bytes; None where unavailable
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        peak = getattr(info, "peak_wset", None)
+        current = info.rss
+    except ImportError:
+        current = peak = None
+        try:
+            with open("/proc/self/statm") as f:
+                current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, AttributeError):
+            pass
+    if peak is None:
+        try:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # ru_maxrss is in kilobytes on Linux and bytes on macOS
+            if sys.platform != "darwin":
+                peak *= 1024
+        except ImportError:
+            pass
+    return current, peak
@@ -0,0 +1,113 @@
+import ctypes
+import ctypes.util
+import gc
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from inference_backends import resident_memory
+
+# Seconds without a caller before the model is unloaded; 0 keeps it for good
+MODEL_IDLE_TIMEOUT = float(os.environ.get("TCB_MODEL_IDLE_TIMEOUT", 600))
+
+
+def _release_freed_memory():
+    # Freed tensors go back to the allocator, not the OS; glibc keeps them
+    # mapped until asked to trim
+    gc.collect()
+    if sys.platform.startswith("linux"):
+        try:
+            ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6").malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
+
+
+class ModelManager:
+    # Holds one model built by load() on first use. Callers borrow it with
+    # use(); after idle_timeout seconds with no borrower it is dropped and
+    # the next caller loads it again.
+    def __init__(self, load, idle_timeout=MODEL_IDLE_TIMEOUT):
+        self._load = load
+        self.idle_timeout = idle_timeout
+        self._model = None
+        self._users = 0
+        self._last_used = 0.0
+        self._timer = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.loads = 0
+        self.unloads = 0
+
+    def get(self):
+        # The model without holding it in use; fine for quick lookups such as
+        # the tokenizer
+        with self._load_lock:
+            with self._lock:
+                model = self._model
+            if model is None:
+                model = self._load()
+                with self._lock:
+                    self._model = model
+                    self.loads += 1
+        with self._lock:
+            self._last_used = time.monotonic()
+            self._schedule()
+        return model
+
+    @contextmanager
+    def use(self):
+        with self._lock:
+            self._users += 1
+        try:
+            yield self.get()
+        finally:
+            with self._lock:
+                self._users -= 1
+                self._last_used = time.monotonic()
+                self._schedule()
+
+    def is_loaded(self):
+        return self._model is not None
+
+    def unload(self):
+        # Waits for a load in progress, so a model built for an old backend
+        # is not kept after a switch
+        with self._load_lock, self._lock:
+            if self._model is None:
+                return
+            self._model = None
+            self.unloads += 1
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        _release_freed_memory()
+
+    def _schedule(self):
+        # Called with _lock held. Nothing is scheduled while the model is in
+        # use; the last caller to leave use() schedules the countdown.
+        if not self.idle_timeout or self._model is None or self._timer is not None or self._users:
+            return
+        delay = max(0.0, self._last_used + self.idle_timeout - time.monotonic())
+        self._timer = threading.Timer(delay, self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _expire(self):
+        with self._lock:
+            self._timer = None
+            if self._model is None:
+                return
+            if self._users:
+                return
+            if time.monotonic() - self._last_used < self.idle_timeout:
+                self._schedule()
+                return
+            self._model = None
+            self.unloads += 1
+        _release_freed_memory()
+
+    def memory(self):
+        current, peak = resident_memory()
+        return {"loaded": self.is_loaded(), "current": current, "peak": peak,
+                "loads": self.loads, "unloads": self.unloads}
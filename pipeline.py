@@ -0,0 +1,144 @@
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Items waiting in front of each stage; a full queue makes the stage before
+# it wait, so a fast fetcher cannot pile up articles the summarizer has not
+# reached yet
+STAGE_QUEUE_SIZE = 4
+STATS_INTERVAL = 5.0
+_DONE = object()
+
+
+class Stage:
+    # One step of a Pipeline: func(item) returns the item for the next stage.
+    # It runs on `workers` threads, or with processes=True on a process pool
+    # of that size (func must then be a module-level function and items must
+    # pickle).
+    def __init__(self, name, func, workers=1, processes=False):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.processes = processes
+
+
+class Pipeline:
+    # Runs items through stages connected by bounded queues, so item n can be
+    # rendered while n+1 is summarized and n+2 downloaded. A run takes about
+    # as long as its slowest stage rather than the sum of them. An item that
+    # fails skips the remaining stages and comes out as its exception.
+    def __init__(self, stages, queue_size=STAGE_QUEUE_SIZE):
+        self.stages = stages
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        self._output = queue.Queue()
+        self._running = [stage.workers for stage in self.stages]
+        self._counts = [{"active": 0, "done": 0, "failed": 0, "busy": 0.0} for _ in self.stages]
+        self._started = time.perf_counter()
+
+    def stats(self):
+        # Per stage: items queued in front of it, being worked on, finished
+        # and failed, plus throughput over the run so far
+        elapsed = max(time.perf_counter() - self._started, 1e-9)
+        with self._lock:
+            return [{"stage": stage.name, "queued": q.qsize(), "active": c["active"], "done": c["done"],
+                     "failed": c["failed"], "busy_seconds": c["busy"], "per_minute": c["done"] * 60 / elapsed}
+                    for stage, q, c in zip(self.stages, self._queues, self._counts)]
+
+    def _next_queue(self, index):
+        return self._queues[index + 1] if index + 1 < len(self.stages) else self._output
+
+    def _worker(self, index, call):
+        counts = self._counts[index]
+        inbox, outbox = self._queues[index], self._next_queue(index)
+        while True:
+            job = inbox.get()
+            if job is _DONE:
+                break
+            n, item, error = job
+            if error is None:
+                with self._lock:
+                    counts["active"] += 1
+                start = time.perf_counter()
+                try:
+                    item = call(item)
+                except Exception as e:
+                    error = e
+                with self._lock:
+                    counts["active"] -= 1
+                    counts["busy"] += time.perf_counter() - start
+                    counts["done" if error is None else "failed"] += 1
+            outbox.put((n, item, error))
+        # The last worker out tells every worker of the next stage to stop
+        with self._lock:
+            self._running[index] -= 1
+            last = self._running[index] == 0
+        if last:
+            if index + 1 < len(self.stages):
+                for _ in range(self.stages[index + 1].workers):
+                    outbox.put(_DONE)
+            else:
+                outbox.put(_DONE)
+
+    def _feed(self, items):
+        for n, item in enumerate(items):
+            self._queues[0].put((n, item, None))
+        for _ in range(self.stages[0].workers):
+            self._queues[0].put(_DONE)
+
+    def run(self, items, on_result=None, on_stats=None, stats_interval=STATS_INTERVAL):
+        # Results (or exceptions) in input order. on_result(n, result) is
+        # called on this thread as each item leaves the last stage, and
+        # on_stats(stats) every stats_interval seconds while items are moving.
+        self._reset()
+        pools = []
+        threads = [threading.Thread(target=self._feed, args=(items,), daemon=True, name="pipeline-feed")]
+        for index, stage in enumerate(self.stages):
+            call = stage.func
+            if stage.processes:
+                # Spawned rather than forked: the parent may hold a loaded
+                # model and running threads that a fork would copy
+                pool = ProcessPoolExecutor(max_workers=stage.workers, mp_context=multiprocessing.get_context("spawn"))
+                pools.append(pool)
+                # Each thread keeps one item in flight on the pool
+                call = lambda item, pool=pool, func=stage.func: pool.submit(func, item).result()
+            threads += [threading.Thread(target=self._worker, args=(index, call), daemon=True,
+                                         name=f"pipeline-{stage.name}-{i}") for i in range(stage.workers)]
+        for t in threads:
+            t.start()
+
+        results = {}
+        next_stats = time.perf_counter() + stats_interval
+        try:
+            while True:
+                try:
+                    job = self._output.get(timeout=max(0.0, next_stats - time.perf_counter()))
+                except queue.Empty:
+                    job = None
+                if on_stats is not None and time.perf_counter() >= next_stats:
+                    on_stats(self.stats())
+                    next_stats = time.perf_counter() + stats_interval
+                if job is None:
+                    continue
+                if job is _DONE:
+                    break
+                n, item, error = job
+                results[n] = item if error is None else error
+                if on_result is not None:
+                    on_result(n, results[n])
+        finally:
+            for pool in pools:
+                pool.shutdown(wait=True)
+        return [results[n] for n in range(len(results))]
+
+
+def format_stats(stats):
+    return "; ".join(f"{s['stage']}: {s['queued']} queued, {s['active']} active, {s['done']} done"
+                     + (f", {s['failed']} failed" if s["failed"] else "")
+                     + f" ({s['per_minute']:.1f}/min, busy {s['busy_seconds']:.1f}s)" for s in stats)
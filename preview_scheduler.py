@@ -0,0 +1,92 @@
+import threading
+
+
+class PreviewScheduler:
+    # Renders previews on one worker thread and hands finished frames back to
+    # the Tk thread with after(). Requests are coalesced: anything submitted
+    # while a render is running replaces the pending one, so a slider drag only
+    # ever renders the newest parameters. When no new request arrives within
+    # idle_delay seconds of a render, on_idle(params) runs on a second thread
+    # for background work such as warming the full-resolution render, so it
+    # never holds up the next preview. Idle work is coalesced the same way.
+    def __init__(self, widget, render, on_done, on_error=None, on_idle=None, idle_delay=0.5):
+        self.widget = widget
+        self.render = render
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_idle = on_idle
+        self.idle_delay = idle_delay
+        self._cond = threading.Condition()
+        self._pending = None
+        self._thread = None
+        self._idle_cond = threading.Condition()
+        self._idle_pending = None
+        self._idle_thread = None
+
+    def submit(self, params):
+        with self._cond:
+            self._pending = params
+            self._cond.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _next(self, idle_params):
+        # Next request to render, or None once the worker has been idle
+        with self._cond:
+            if self._pending is None and idle_params is not None:
+                self._cond.wait(self.idle_delay)
+                if self._pending is None:
+                    return None
+            while self._pending is None:
+                self._cond.wait()
+            params = self._pending
+            self._pending = None
+            return params
+
+    def _run(self):
+        idle_params = None
+        while True:
+            params = self._next(idle_params)
+            if params is None:
+                self._submit_idle(idle_params)
+                idle_params = None
+                continue
+            try:
+                result, error = self.render(params), None
+            except Exception as e:
+                result, error = None, e
+            if error is None and self.on_idle:
+                idle_params = params
+            try:
+                self.widget.after(0, self._deliver, result, error)
+            except RuntimeError:
+                # Tk main loop is gone; nothing left to deliver to
+                return
+
+    def _submit_idle(self, params):
+        with self._idle_cond:
+            self._idle_pending = params
+            self._idle_cond.notify()
+            if self._idle_thread is None:
+                self._idle_thread = threading.Thread(target=self._run_idle, daemon=True)
+                self._idle_thread.start()
+
+    def _run_idle(self):
+        while True:
+            with self._idle_cond:
+                while self._idle_pending is None:
+                    self._idle_cond.wait()
+                params = self._idle_pending
+                self._idle_pending = None
+            try:
+                self.on_idle(params)
+            except Exception as e:
+                print(f"Preview idle task failed: {e}")
+
+    def _deliver(self, result, error):
+        # Runs on the Tk thread
+        if error is None:
+            self.on_done(result)
+        elif self.on_error:
+            self.on_error(error)
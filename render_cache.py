@@ -0,0 +1,162 @@
+import hashlib
+import math
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from PIL import Image, ImageOps
+
+CARD_WIDTH = 1080
+CARD_HEIGHT = 1280
+EXIF_ORIENTATION = 0x0112
+LAYER_CACHE_BUDGET = 256 * 1024 * 1024  # bytes of decoded pixels kept between renders
+RESULT_CACHE_BUDGET = 64 * 1024 * 1024  # bytes of encoded finished cards
+
+
+def file_key(path):
+    # Source identity for cache keys: a replaced or re-saved file gets a new key
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=64)
+def _digest(key):
+    h = hashlib.sha256()
+    with open(key[0], "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_digest(path):
+    # Content hash of a source file, recomputed only when its file_key changes
+    return _digest(file_key(path))
+
+
+def content_key(parts):
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+
+def image_nbytes(img):
+    return img.width * img.height * len(img.getbands())
+
+
+class LayerCache:
+    def __init__(self, budget_bytes=LAYER_CACHE_BUDGET):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key, factory):
+        with self._lock:
+            img = self._entries.get(key)
+            if img is not None:
+                self._entries.move_to_end(key)
+                return img
+
+        img = factory()
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = img
+                self._size += image_nbytes(img)
+            # Least recently used layers go first; the newest one always stays
+            while self._size > self.budget_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self._size -= image_nbytes(old)
+        return img
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def size_bytes(self):
+        return self._size
+
+
+layer_cache = LayerCache()
+
+
+class ResultCache:
+    # Encoded finished cards keyed by a content hash of every render input
+    def __init__(self, budget_bytes=RESULT_CACHE_BUDGET):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.budget_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self._size -= len(old)
+
+
+result_cache = ResultCache()
+
+
+def open_background(bg_path, width):
+    # Decode a photo straight to roughly the card width: JPEGs are decoded at
+    # the smallest DCT scale (1/2, 1/4, 1/8) that still covers the target,
+    # EXIF orientation is applied, and the final LANCZOS pass reduces in
+    # steps (reducing_gap) instead of filtering the full-size image
+    img = Image.open(bg_path)
+    src_w, src_h = img.size
+    if img.getexif().get(EXIF_ORIENTATION, 1) in (5, 6, 7, 8):
+        src_w, src_h = src_h, src_w
+    factor = width / float(src_w)
+    h_size = int(float(src_h) * factor)
+    if factor < 1:
+        stored_w, stored_h = img.size
+        img.draft(img.mode, (math.ceil(stored_w * factor), math.ceil(stored_h * factor)))
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    img = img.resize((width, h_size), Image.LANCZOS, reducing_gap=3.0)
+    return img.convert("RGBA")
+
+
+def load_background(bg_path, width=CARD_WIDTH):
+    return layer_cache.get_or_create(("background", file_key(bg_path), width), lambda: open_background(bg_path, width))
+
+
+def load_overlay(path, scale=1.0):
+    # Template and icon are drawn for a 1080px card; other widths scale them
+    def build():
+        img = Image.open(path).convert("RGBA")
+        if scale != 1.0:
+            size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+            img = img.resize(size, Image.LANCZOS)
+        return img
+
+    return layer_cache.get_or_create(("overlay", file_key(path), scale), build)
+
+
+def load_base_layer(bg_path, template_path, width=CARD_WIDTH):
+    # Background with the template composited on top; everything below the icon
+    def build():
+        bg = load_background(bg_path, width)
+        overlay = load_overlay(template_path, width / CARD_WIDTH)
+        canvas_height = max(bg.size[1], overlay.size[1])
+        canvas = Image.new("RGBA", (width, canvas_height), (0, 0, 0, 255))
+        canvas.paste(bg, (0, 0))
+        canvas.alpha_composite(overlay, (0, 0))
+        return canvas
+
+    key = ("base", file_key(bg_path), file_key(template_path), width)
+    return layer_cache.get_or_create(key, build)
+
@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+class SQLiteLRUCache:
+    # One SQLite table of entries, each with a size and a last_used time,
+    # trimmed least recently used first once the sizes add up to more than
+    # max_bytes, plus named counters (hits, misses, ...) that persist across
+    # runs. Subclasses set TABLE, COLUMNS (column definitions besides key,
+    # size and last_used) and COUNTERS (the names stats() reports).
+    TABLE = None
+    COLUMNS = ()
+    COUNTERS = ()
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        columns = ", ".join(("key TEXT PRIMARY KEY",) + tuple(self.COLUMNS)
+                            + ("size INTEGER NOT NULL", "last_used REAL NOT NULL"))
+        with self._lock, self._conn:
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {self.TABLE} ({columns})")
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {self.TABLE}_last_used ON {self.TABLE} (last_used)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _count(self, name):
+        # Called with _lock held inside a transaction
+        self._conn.execute("INSERT INTO stats (name, value) VALUES (?, 1) "
+                           "ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+
+    def count(self, name):
+        with self._lock, self._conn:
+            self._count(name)
+
+    def _get_row(self, key):
+        # The entry's row, marked as just used; None if absent. Called with
+        # _lock held inside a transaction
+        row = self._conn.execute(f"SELECT * FROM {self.TABLE} WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._conn.execute(f"UPDATE {self.TABLE} SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row
+
+    def _put_row(self, values):
+        # values maps column names to values, including key and size
+        values = dict(values, last_used=time.time())
+        names = ", ".join(values)
+        marks = ", ".join("?" * len(values))
+        with self._lock, self._conn:
+            self._conn.execute(f"INSERT OR REPLACE INTO {self.TABLE} ({names}) VALUES ({marks})",
+                               tuple(values.values()))
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in self._conn.execute(f"SELECT key, size FROM {self.TABLE} ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany(f"DELETE FROM {self.TABLE} WHERE key = ?", stale)
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT name, value FROM stats").fetchall())
+            entries, size = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.TABLE}").fetchone()
+        stats = {name: counts.get(name, 0) for name in self.COUNTERS}
+        stats.update(entries=entries, bytes=size)
+        return stats
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.TABLE}")
+            self._conn.execute("DELETE FROM stats")
@@ -0,0 +1,561 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from extractive import extractive_summary
+from inference_backends import BACKENDS, DEFAULT_BACKEND, load_pipeline, load_tokenizer
+from model_manager import ModelManager
+from summary_cache import SummaryCache, summary_key
+
+MODEL_NAME = "sshleifer/distilbart-cnn-12-6"
+# Tokens per chunk, a little under the model's 1024-token input window
+CHUNK_TOKEN_LIMIT = 950
+# Identifies chunk_text's behaviour in summary cache keys
+CHUNKER_ID = f"sentence-tokens-{CHUNK_TOKEN_LIMIT}"
+# Padded input tokens per model call (batch size x longest chunk in the batch)
+BATCH_TOKEN_BUDGET = 4096
+# "map_reduce" re-summarizes joined chunk summaries until they fit the
+# requested length; "concat" joins the chunk summaries as they are
+SUMMARY_MODE = "map_reduce"
+MAX_REDUCE_ROUNDS = 4
+# "abstractive" runs the model; "extractive" picks TextRank sentences in
+# milliseconds; "auto" uses extractive for short articles or when the model
+# could not finish within the latency budget (seconds, from
+# TCB_SUMMARY_LATENCY_BUDGET or per call)
+SUMMARY_METHOD = "auto"
+SHORT_ARTICLE_WORDS = 300
+LATENCY_BUDGET = float(os.environ["TCB_SUMMARY_LATENCY_BUDGET"]) if os.environ.get("TCB_SUMMARY_LATENCY_BUDGET") else None
+# Rough model tokens per word, to size text without loading the tokenizer
+TOKENS_PER_WORD = 1.3
+# Assumed seconds per chunk until a real map stage has been timed
+DEFAULT_CHUNK_SECONDS = 3.0
+# Generation policy: each chunk's length limits scale with its own token
+# count, rounded to LENGTH_STEP so similar chunks still share a batch, and a
+# chunk that already fits in max_length is used as it is. Decoding is "beam"
+# (the model's own beam search), "greedy", or "adaptive": greedy for chunks
+# under GREEDY_BELOW_TOKENS, beam for the rest.
+SUMMARY_RATIO = 0.5
+MIN_SUMMARY_RATIO = 0.1
+LENGTH_STEP = 16
+GREEDY_BELOW_TOKENS = 256
+DECODING_MODES = ("beam", "greedy", "adaptive")
+DECODING = os.environ.get("TCB_SUMMARY_DECODING", "adaptive")
+# Identifies the policy in summary cache keys
+POLICY_ID = f"scaled-{SUMMARY_RATIO}-{MIN_SUMMARY_RATIO}-{LENGTH_STEP}-{GREEDY_BELOW_TOKENS}"
+
+# transformers, torch and the model are only imported on first use, so the
+# GUIs and CLIs can show a window or prompt while the model loads. The model
+# is unloaded again after MODEL_IDLE_TIMEOUT seconds unused.
+_backend = DEFAULT_BACKEND
+_models = ModelManager(lambda: load_pipeline(MODEL_NAME, _backend))
+# One model call at a time: a pipeline is not thread-safe, and torch already
+# spreads each call over every core, so concurrent calls only oversubscribe
+# the CPU. Throughput comes from batching chunks within a call instead.
+_inference_lock = threading.Lock()
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])["\'”’)]?\s+')
+
+
+def get_summarizer():
+    return _models.get()
+
+
+def set_backend(backend):
+    # Switch inference backend; the current model is dropped and the new one
+    # loads on next use
+    global _backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown summarizer backend {backend!r}")
+    if backend != _backend:
+        _backend = backend
+        _models.unload()
+
+
+def unload_summarizer():
+    _models.unload()
+
+
+def set_idle_timeout(seconds):
+    # 0 keeps the model loaded until unload_summarizer()
+    _models.idle_timeout = seconds
+
+
+def memory_usage():
+    # {"loaded", "current", "peak", "loads", "unloads"}; sizes are resident
+    # bytes for the whole process, None where the platform cannot tell
+    return _models.memory()
+
+
+def get_backend():
+    return _backend
+
+
+def get_tokenizer():
+    # Independent of the managed model, so it survives an idle unload and
+    # daemon clients never load the model just to count tokens
+    return load_tokenizer(MODEL_NAME)
+
+
+def is_summarizer_ready():
+    return _models.is_loaded()
+
+
+def preload_summarizer(on_ready=None, on_error=None):
+    # Load the model on a background thread unless a summary daemon already
+    # holds one; callbacks run on that thread
+    def task():
+        try:
+            from summary_daemon import daemon_available
+            if not daemon_available():
+                get_summarizer()
+        except Exception as e:
+            if on_error:
+                on_error(e)
+            return
+        if on_ready:
+            on_ready()
+
+    threading.Thread(target=task, daemon=True).start()
+
+
+@lru_cache(maxsize=1)
+def _punkt_available():
+    # Local lookup only; never goes to the network the way nltk.download does
+    try:
+        import nltk
+        nltk.sent_tokenize("Checking punkt. Locally.")
+        return True
+    except (ImportError, LookupError):
+        return False
+
+
+def sent_tokenize(text):
+    if _punkt_available():
+        import nltk
+        return nltk.sent_tokenize(text)
+    return [s for s in _SENTENCE_END.split(text) if s.strip()]
+
+
+def _sentence_ends(text):
+    # Character offsets just past each sentence
+    ends = []
+    pos = 0
+    for sentence in sent_tokenize(text):
+        start = text.find(sentence, pos)
+        if start < 0:
+            continue
+        pos = start + len(sentence)
+        ends.append(pos)
+    return ends
+
+
+def chunk_text(text, token_budget=CHUNK_TOKEN_LIMIT):
+    # Tokenize the whole article once with offsets and cut it into chunks of
+    # at most token_budget tokens at sentence boundaries. Chunks aim for an
+    # even share of the article so the last one is not a short tail; a
+    # sentence longer than the budget is cut mid-sentence.
+    text = text.strip()
+    if not text:
+        return []
+    tokenizer = get_tokenizer()
+    offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)["offset_mapping"]
+    total = len(offsets)
+    if total <= token_budget:
+        return [text]
+
+    token_starts = [start for start, _ in offsets]
+    boundaries = sorted({bisect_left(token_starts, end) for end in _sentence_ends(text)} | {total})
+    n_chunks = -(-total // token_budget)
+    target = -(-total // n_chunks)
+
+    chunks = []
+    start = 0
+    while start < total:
+        limit = min(start + token_budget, total)
+        lo = bisect_left(boundaries, start + 1)
+        hi = bisect_left(boundaries, limit + 1)
+        candidates = boundaries[lo:hi]
+        if candidates:
+            end = min(candidates, key=lambda b: abs(b - (start + target)))
+        else:
+            end = limit
+        chunk = text[offsets[start][0]:offsets[end - 1][1]].strip()
+        if chunk:
+            chunks.append(chunk)
+        start = end
+    return chunks
+
+
+def generation_settings(n_tokens, max_length, min_length, decoding=DECODING):
+    # (max_length, min_length, num_beams) for a chunk of n_tokens, or None
+    # when the chunk is short enough to keep. num_beams None leaves the
+    # model's default.
+    if n_tokens <= max_length:
+        return None
+    chunk_max = min(max_length, -(-round(n_tokens * SUMMARY_RATIO) // LENGTH_STEP) * LENGTH_STEP)
+    chunk_min = min(min_length, round(n_tokens * MIN_SUMMARY_RATIO) // LENGTH_STEP * LENGTH_STEP, chunk_max - 1)
+    greedy = decoding == "greedy" or (decoding == "adaptive" and n_tokens < GREEDY_BELOW_TOKENS)
+    return chunk_max, chunk_min, 1 if greedy else None
+
+
+def _gen_kwargs(settings):
+    chunk_max, chunk_min, num_beams = settings
+    kwargs = dict(max_length=chunk_max, min_length=chunk_min, do_sample=False, truncation=True)
+    if num_beams is not None:
+        kwargs["num_beams"] = num_beams
+    return kwargs
+
+
+def _batches(order, lengths, token_budget, settings):
+    # order is sorted by length, so the last chunk added is the longest and
+    # sets the padded width of the batch. A batch shares one set of
+    # generation settings.
+    batch = []
+    for i in order:
+        if batch and ((len(batch) + 1) * lengths[i] > token_budget or settings[i] != settings[batch[-1]]):
+            yield batch
+            batch = []
+        batch.append(i)
+    if batch:
+        yield batch
+
+
+def _stream_one(summarizer, text, gen_kwargs, on_text):
+    # Generate on a helper thread and pass each decoded piece to on_text as
+    # it arrives; returns the pipeline output like a plain call
+    from transformers import TextIteratorStreamer
+    streamer = TextIteratorStreamer(summarizer.tokenizer, skip_prompt=True, skip_special_tokens=True)
+    result = {}
+
+    def generate():
+        try:
+            result["out"] = summarizer(text, streamer=streamer, **gen_kwargs)[0]
+        except Exception as e:
+            result["error"] = e
+            streamer.end()
+
+    thread = threading.Thread(target=generate, daemon=True)
+    thread.start()
+    for piece in streamer:
+        if piece:
+            on_text(piece)
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["out"]
+
+
+def summarize_chunks(chunks, max_length, min_length, token_budget=BATCH_TOKEN_BUDGET, on_error=None, on_chunk=None,
+                     on_text=None, decoding=DECODING):
+    # Summaries in input order. Chunks are sorted by token length and sent
+    # through the model in padded batches; if a batch fails, its chunks are
+    # retried one at a time and on_error(index, exception) is called for each
+    # chunk that still fails (its summary is None). Without on_error the
+    # exception propagates. on_chunk(index, summary) runs as each chunk is
+    # done. With on_text(index, piece) chunks are generated one at a time in
+    # input order and streamed as they decode, since a streamer cannot follow
+    # a batch. Length limits and decoding follow generation_settings.
+    if not chunks:
+        return []
+    with _inference_lock, _models.use() as summarizer:
+        return _run_chunks(summarizer, chunks, max_length, min_length, token_budget, on_error, on_chunk, on_text,
+                           decoding)
+
+
+def _run_chunks(summarizer, chunks, max_length, min_length, token_budget, on_error, on_chunk, on_text, decoding):
+    lengths = [len(ids) for ids in summarizer.tokenizer(chunks, truncation=True)["input_ids"]]
+    settings = [generation_settings(n, max_length, min_length, decoding) for n in lengths]
+
+    results = [None] * len(chunks)
+    if on_text is not None:
+        # Chunks kept as they are stream at their own place, so the draft
+        # reads in article order
+        for i, text in enumerate(chunks):
+            if settings[i] is None:
+                results[i] = text
+                on_text(i, text)
+                if on_chunk:
+                    on_chunk(i, text)
+                continue
+            try:
+                out = _stream_one(summarizer, text, _gen_kwargs(settings[i]), lambda piece: on_text(i, piece))
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(i, e)
+                out = None
+            results[i] = out['summary_text'] if out else None
+            if on_chunk:
+                on_chunk(i, results[i])
+        return results
+
+    for i, text in enumerate(chunks):
+        if settings[i] is None:
+            results[i] = text
+            if on_chunk:
+                on_chunk(i, text)
+
+    order = sorted((i for i in range(len(chunks)) if settings[i] is not None), key=lambda i: lengths[i])
+    for batch in _batches(order, lengths, token_budget, settings):
+        texts = [chunks[i] for i in batch]
+        gen_kwargs = _gen_kwargs(settings[batch[0]])
+        try:
+            outs = summarizer(texts, batch_size=len(texts), **gen_kwargs)
+        except Exception:
+            if len(batch) == 1 and on_error is None:
+                raise
+            outs = []
+            for i, text in zip(batch, texts):
+                try:
+                    outs.append(summarizer(text, **gen_kwargs)[0])
+                except Exception as e:
+                    if on_error is None:
+                        raise
+                    on_error(i, e)
+                    outs.append(None)
+        for i, out in zip(batch, outs):
+            results[i] = out['summary_text'] if out else None
+            if on_chunk:
+                on_chunk(i, results[i])
+    return results
+
+
+def summarize_many(chunk_lists, max_length, min_length, token_budget=BATCH_TOKEN_BUDGET, on_error=None, decoding=DECODING):
+    # Batch the chunks of several articles together; returns one list of
+    # chunk summaries per article. on_error gets (article index, chunk index, e)
+    flat = [chunk for chunks in chunk_lists for chunk in chunks]
+    owners = [(a, c) for a, chunks in enumerate(chunk_lists) for c in range(len(chunks))]
+    report = (lambda i, e: on_error(owners[i][0], owners[i][1], e)) if on_error else None
+    summaries = summarize_chunks(flat, max_length, min_length, token_budget, report, decoding=decoding)
+    results = []
+    pos = 0
+    for chunks in chunk_lists:
+        results.append(summaries[pos:pos + len(chunks)])
+        pos += len(chunks)
+    return results
+
+
+_summary_cache = None
+_summary_cache_failed = False
+_cache_lock = threading.Lock()
+_chunk_seconds = None
+
+
+def get_summary_cache():
+    # Shared on-disk cache, or None if it cannot be opened (e.g. read-only home)
+    global _summary_cache, _summary_cache_failed
+    with _cache_lock:
+        if _summary_cache is None and not _summary_cache_failed:
+            try:
+                _summary_cache = SummaryCache()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Summary cache disabled: {e}")
+                _summary_cache_failed = True
+        return _summary_cache
+
+
+def _cache_key(text, settings):
+    # Backends differ slightly in output, so each keeps its own entries
+    return summary_key(text, f"{MODEL_NAME}:{_backend}", settings)
+
+
+def _cache_get(key):
+    cache = get_summary_cache()
+    if cache is None:
+        return None
+    try:
+        return cache.get(key)
+    except sqlite3.Error as e:
+        print(f"Summary cache read failed: {e}")
+        return None
+
+
+def _cache_put(key, summary):
+    cache = get_summary_cache()
+    if cache is None or not summary:
+        return
+    try:
+        cache.put(key, summary)
+    except sqlite3.Error as e:
+        print(f"Summary cache write failed: {e}")
+
+
+def cached_summary(text, settings, compute):
+    # Look the article up by content hash before running inference. settings
+    # holds everything besides the text that changes the output; compute()
+    # returns (summary, complete) and only complete summaries are stored
+    key = _cache_key(text, settings)
+    summary = _cache_get(key)
+    if summary is not None:
+        return summary
+    summary, complete = compute()
+    if complete:
+        _cache_put(key, summary)
+    return summary
+
+
+def _summary_settings(max_length, min_length, mode, decoding):
+    return {"chunker": CHUNKER_ID, "max_length": max_length, "min_length": min_length, "mode": mode,
+            "policy": POLICY_ID, "decoding": decoding}
+
+
+def count_tokens(text):
+    return len(get_tokenizer()(text, add_special_tokens=False, verbose=False)["input_ids"])
+
+
+def _record_chunk_time(seconds, n_chunks):
+    # Running estimate of model seconds per chunk for the latency budget
+    global _chunk_seconds
+    sample = seconds / n_chunks
+    _chunk_seconds = sample if _chunk_seconds is None else 0.5 * (_chunk_seconds + sample)
+
+
+def choose_method(text, latency_budget=None):
+    words = len(text.split())
+    if words <= SHORT_ARTICLE_WORDS:
+        return "extractive"
+    if latency_budget is None:
+        return "abstractive"
+    # Loading the model alone takes longer than any sensible budget
+    if not is_summarizer_ready():
+        return "extractive"
+    n_chunks = -(-int(words * TOKENS_PER_WORD) // CHUNK_TOKEN_LIMIT)
+    per_chunk = _chunk_seconds if _chunk_seconds is not None else DEFAULT_CHUNK_SECONDS
+    return "abstractive" if n_chunks * per_chunk <= latency_budget else "extractive"
+
+
+def summarize_extractive(text, max_length):
+    return extractive_summary(sent_tokenize(text.strip()), max(1, int(max_length / TOKENS_PER_WORD)))
+
+
+def summarize_document(text, max_length, min_length, mode=SUMMARY_MODE, on_error=None, log=None,
+                       use_cache=True, method=SUMMARY_METHOD, latency_budget=LATENCY_BUDGET, on_text=None, on_progress=None,
+                       use_daemon=True, decoding=DECODING):
+    # Summarize a whole article, checking the summary cache first. In
+    # map_reduce mode the joined chunk summaries are summarized again,
+    # recursing until the result fits in max_length tokens, so caption size
+    # does not grow with article length. on_error(chunk index, e) as in
+    # summarize_chunks; log(message) receives progress lines. Extractive
+    # summaries are cheap and never cached.
+    # on_text(round, chunk index, piece) streams generated text (round 0 is
+    # the map stage) and on_progress(done, total) counts finished chunks over
+    # all rounds; neither is called for cached or extractive summaries.
+    # A running summary daemon does the work when there is one; if it goes
+    # away after output has started, summary_daemon.DaemonConnectionLost is
+    # raised rather than streaming the same chunks again locally. decoding
+    # is one of DECODING_MODES.
+    if decoding not in DECODING_MODES:
+        raise ValueError(f"Unknown decoding mode {decoding!r}")
+    if use_daemon:
+        from summary_daemon import DaemonUnavailable, remote_summarize
+        try:
+            return remote_summarize(text, max_length, min_length, mode=mode, on_error=on_error, log=log,
+                                    use_cache=use_cache, method=method, latency_budget=latency_budget,
+                                    on_text=on_text, on_progress=on_progress, decoding=decoding)
+        except DaemonUnavailable:
+            pass
+    return _summarize_local(text, max_length, min_length, mode, on_error, log, use_cache, method, latency_budget,
+                            on_text, on_progress, decoding)
+
+
+def _summarize_local(text, max_length, min_length, mode, on_error, log, use_cache, method, latency_budget,
+                     on_text, on_progress, decoding):
+    if method == "auto":
+        method = choose_method(text, latency_budget)
+    if method == "extractive":
+        if log:
+            log("⚡ Extractive summary")
+        return summarize_extractive(text, max_length)
+    if method != "abstractive":
+        raise ValueError(f"Unknown summary method {method!r}")
+    failed = []
+    done = total = 0
+
+    def report(i, e):
+        failed.append(i)
+        on_error(i, e)
+
+    def chunk_done(i, summary):
+        nonlocal done
+        done += 1
+        on_progress(done, total)
+
+    def compute():
+        nonlocal total
+        current = text
+        for round_no in range(MAX_REDUCE_ROUNDS if mode == "map_reduce" else 1):
+            chunks = chunk_text(current)
+            if log:
+                log(f"🔍 Total chunk(s): {len(chunks)}" if round_no == 0 else f"🔁 Reducing {len(chunks)} chunk(s)")
+            total += len(chunks)
+            if on_progress:
+                on_progress(done, total)
+            stream = (lambda i, piece, r=round_no: on_text(r, i, piece)) if on_text else None
+            start = time.perf_counter()
+            summaries = summarize_chunks(chunks, max_length, min_length, on_error=report if on_error else None,
+                                         on_chunk=chunk_done if on_progress else None, on_text=stream,
+                                         decoding=decoding)
+            if chunks:
+                _record_chunk_time(time.perf_counter() - start, len(chunks))
+            current = " ".join(s for s in summaries if s).strip()
+            if len(chunks) <= 1 or count_tokens(current) <= max_length:
+                break
+        return current, not failed
+
+    if not use_cache:
+        return compute()[0]
+    return cached_summary(text, _summary_settings(max_length, min_length, mode, decoding), compute)
+
+
+def summarize_documents(texts, max_length, min_length, mode=SUMMARY_MODE, on_error=None, log=None, use_cache=True,
+                        method=SUMMARY_METHOD, latency_budget=LATENCY_BUDGET, decoding=DECODING):
+    # summarize_document for several articles at once, always in process:
+    # each map and reduce round batches the chunks of every article still
+    # being summarized together. on_error(article index, chunk index, e)
+    results = [None] * len(texts)
+    keys = {}
+    active = {}
+    for a, text in enumerate(texts):
+        chosen = choose_method(text, latency_budget) if method == "auto" else method
+        if chosen == "extractive":
+            results[a] = summarize_extractive(text, max_length)
+            continue
+        if chosen != "abstractive":
+            raise ValueError(f"Unknown summary method {method!r}")
+        if use_cache:
+            keys[a] = _cache_key(text, _summary_settings(max_length, min_length, mode, decoding))
+            results[a] = _cache_get(keys[a])
+            if results[a] is not None:
+                continue
+        active[a] = text
+
+    computed = list(active)
+    failed = set()
+    for round_no in range(MAX_REDUCE_ROUNDS if mode == "map_reduce" else 1):
+        if not active:
+            break
+        ids = list(active)
+        chunk_lists = [chunk_text(active[a]) for a in ids]
+        if log:
+            verb = "🔍 Summarizing" if round_no == 0 else "🔁 Reducing"
+            log(f"{verb} {sum(map(len, chunk_lists))} chunk(s) from {len(ids)} article(s)")
+
+        def report(a, c, e):
+            failed.add(ids[a])
+            on_error(ids[a], c, e)
+
+        summaries = summarize_many(chunk_lists, max_length, min_length, on_error=report if on_error else None,
+                                   decoding=decoding)
+        active = {}
+        for a, chunks, chunk_summaries in zip(ids, chunk_lists, summaries):
+            results[a] = " ".join(s for s in chunk_summaries if s).strip()
+            if mode == "map_reduce" and len(chunks) > 1 and count_tokens(results[a]) > max_length:
+                active[a] = results[a]
+
+    for a in computed:
+        if a in keys and a not in failed:
+            _cache_put(keys[a], results[a])
+    return results
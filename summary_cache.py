@@ -0,0 +1,43 @@
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from sqlite_lru import SQLiteLRUCache
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "tcb-photocard")
+SUMMARY_CACHE_PATH = os.path.join(CACHE_DIR, "summaries.sqlite3")
+SUMMARY_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+def normalize_text(text):
+    # The same story from a different URL or with different wrapping should
+    # hash the same: unify Unicode forms and collapse all whitespace
+    return re.sub(r'\s+', ' ', unicodedata.normalize("NFKC", text)).strip()
+
+
+def summary_key(text, model_name, settings):
+    payload = json.dumps({"text": normalize_text(text), "model": model_name, "settings": settings},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SummaryCache(SQLiteLRUCache):
+    # SQLite store of finished summaries, evicted least recently used first
+    # once the stored summaries exceed max_bytes. Hit and miss counts persist
+    # across runs.
+    TABLE = "summaries"
+    COLUMNS = ("summary TEXT NOT NULL",)
+    COUNTERS = ("hits", "misses")
+
+    def __init__(self, path=SUMMARY_CACHE_PATH, max_bytes=SUMMARY_CACHE_MAX_BYTES):
+        super().__init__(path, max_bytes)
+
+    def get(self, key):
+        with self._lock, self._conn:
+            row = self._get_row(key)
+            self._count("misses" if row is None else "hits")
+            return None if row is None else row["summary"]
+
+    def put(self, key, summary):
+        self._put_row({"key": key, "summary": summary, "size": len(summary.encode("utf-8"))})
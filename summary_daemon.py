@@ -0,0 +1,273 @@
+import json
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+import summarizer
+from summary_cache import CACHE_DIR
+
+# One JSON object per line each way. A request is {"op": "summarize", "text",
+# "max_length", "min_length", ...summarize_document options} or {"op": "ping"}.
+# The daemon answers with event lines ({"event": "log" | "text" | "progress" |
+# "chunk_error", ...}) and then one final {"ok": true, "summary": ...} or
+# {"ok": false, "error": ...}.
+SOCKET_PATH = os.environ.get("TCB_SUMMARY_SOCKET", os.path.join(CACHE_DIR, "summarizer.sock"))
+CONNECT_TIMEOUT = 1.0
+REQUEST_TIMEOUT = 600.0
+# Requests arriving within this many seconds of each other share a batch
+BATCH_WINDOW = 0.05
+MAX_BATCH_ARTICLES = 8
+OPTIONS = ("mode", "use_cache", "method", "latency_budget", "decoding")
+
+
+class DaemonUnavailable(Exception):
+    pass
+
+
+class DaemonConnectionLost(RuntimeError):
+    # The daemon went away after it had started answering; the caller has
+    # already received part of the result, so it must not simply run again
+    pass
+
+
+def _connect(path=SOCKET_PATH):
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonUnavailable("Unix sockets are not supported on this platform")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+    except OSError as e:
+        sock.close()
+        raise DaemonUnavailable(str(e))
+    sock.settimeout(REQUEST_TIMEOUT)
+    return sock
+
+
+def _request(message, on_event=None, path=SOCKET_PATH):
+    # Losing the connection counts as DaemonUnavailable only until the first
+    # event has been handed to on_event; after that it is DaemonConnectionLost
+    sock = _connect(path)
+    started = False
+    try:
+        with sock, sock.makefile("rw", encoding="utf-8") as f:
+            f.write(json.dumps(message) + "\n")
+            f.flush()
+            for line in f:
+                reply = json.loads(line)
+                if "event" not in reply:
+                    return reply
+                if on_event:
+                    started = True
+                    on_event(reply)
+        error = "closed the connection"
+    except (OSError, ValueError) as e:
+        error = f"connection lost: {e}"
+    if started:
+        raise DaemonConnectionLost(f"Summary daemon {error} mid-request")
+    raise DaemonUnavailable(f"Summary daemon {error}")
+
+
+def daemon_available(path=SOCKET_PATH):
+    try:
+        return _request({"op": "ping"}, path=path).get("ok", False)
+    except DaemonUnavailable:
+        return False
+
+
+def remote_summarize(text, max_length, min_length, on_error=None, log=None, on_text=None, on_progress=None, **options):
+    # Same arguments and result as summarizer.summarize_document; raises
+    # DaemonUnavailable when no daemon answers so the caller can run locally,
+    # and DaemonConnectionLost if it goes away after events were delivered
+    def on_event(event):
+        kind = event["event"]
+        if kind == "log" and log:
+            log(event["message"])
+        elif kind == "text" and on_text:
+            on_text(event["round"], event["chunk"], event["piece"])
+        elif kind == "progress" and on_progress:
+            on_progress(event["done"], event["total"])
+        elif kind == "chunk_error" and on_error:
+            on_error(event["chunk"], RuntimeError(event["error"]))
+
+    message = dict(options, op="summarize", text=text, max_length=max_length, min_length=min_length,
+                   errors=on_error is not None, log=log is not None,
+                   stream=on_text is not None or on_progress is not None)
+    reply = _request(message, on_event)
+    if not reply.get("ok"):
+        raise RuntimeError(reply.get("error", "Summary daemon failed"))
+    return reply["summary"]
+
+
+class Job:
+    def __init__(self, request, emit):
+        self.request = request
+        self.emit = emit
+        self.done = threading.Event()
+        self.reply = None
+
+    def finish(self, reply):
+        self.reply = reply
+        self.done.set()
+
+
+class SummaryBatcher:
+    # One worker thread owns the model. Plain requests that arrive close
+    # together are summarized as one batch; streamed ones run on their own.
+    def __init__(self):
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, job):
+        self._queue.put(job)
+        job.done.wait()
+        return job.reply
+
+    def _collect(self):
+        jobs = [self._queue.get()]
+        deadline = time.monotonic() + BATCH_WINDOW
+        while len(jobs) < MAX_BATCH_ARTICLES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                jobs.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return jobs
+
+    def _run(self):
+        while True:
+            jobs = self._collect()
+            groups = {}
+            for job in jobs:
+                if job.request.get("stream"):
+                    self._run_single(job)
+                    continue
+                r = job.request
+                group = (r["max_length"], r["min_length"]) + tuple(r.get(name) for name in OPTIONS)
+                groups.setdefault(group, []).append(job)
+            for group in groups.values():
+                self._run_batch(group)
+
+    def _run_single(self, job):
+        r = job.request
+        options = {name: r[name] for name in OPTIONS if name in r}
+        try:
+            summary = summarizer.summarize_document(
+                r["text"], r["max_length"], r["min_length"], use_daemon=False,
+                on_error=(lambda i, e: job.emit({"event": "chunk_error", "chunk": i, "error": str(e)})) if r.get("errors") else None,
+                log=(lambda message: job.emit({"event": "log", "message": message})) if r.get("log") else None,
+                on_text=lambda round_no, i, piece: job.emit({"event": "text", "round": round_no, "chunk": i, "piece": piece}),
+                on_progress=lambda done, total: job.emit({"event": "progress", "done": done, "total": total}),
+                **options)
+            job.finish({"ok": True, "summary": summary})
+        except Exception as e:
+            job.finish({"ok": False, "error": str(e)})
+
+    def _run_batch(self, jobs):
+        r = jobs[0].request
+        options = {name: r[name] for name in OPTIONS if name in r}
+        for job in jobs:
+            if job.request.get("log") and len(jobs) > 1:
+                job.emit({"event": "log", "message": f"📦 Batched with {len(jobs) - 1} other request(s)"})
+
+        def report(a, c, e):
+            if jobs[a].request.get("errors"):
+                jobs[a].emit({"event": "chunk_error", "chunk": c, "error": str(e)})
+
+        try:
+            summaries = summarizer.summarize_documents([job.request["text"] for job in jobs], r["max_length"],
+                                                       r["min_length"], on_error=report, **options)
+        except Exception as e:
+            for job in jobs:
+                job.finish({"ok": False, "error": str(e)})
+            return
+        for job, summary in zip(jobs, summaries):
+            job.finish({"ok": True, "summary": summary})
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        lock = threading.Lock()
+
+        def emit(message):
+            # Events come from the worker thread; a vanished client must not
+            # stop it
+            with lock:
+                try:
+                    self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+                except OSError:
+                    pass
+
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                emit({"ok": False, "error": f"Bad request: {e}"})
+                continue
+            op = request.get("op")
+            if op == "ping":
+                emit({"ok": True, "pid": os.getpid(), "model": summarizer.MODEL_NAME,
+                      "backend": summarizer.get_backend(), "ready": summarizer.is_summarizer_ready(),
+                      "memory": summarizer.memory_usage()})
+            elif op == "summarize":
+                emit(self.server.batcher.submit(Job(request, emit)))
+            else:
+                emit({"ok": False, "error": f"Unknown op {op!r}"})
+
+
+class SummaryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path):
+        super().__init__(path, RequestHandler)
+        self.batcher = SummaryBatcher()
+
+
+def serve(path=SOCKET_PATH):
+    if daemon_available(path):
+        print(f"A summary daemon is already listening on {path}")
+        return
+    if os.path.exists(path):
+        # Left behind by a daemon that did not shut down cleanly
+        os.unlink(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    print(f"Loading {summarizer.MODEL_NAME} ({summarizer.get_backend()})...")
+    summarizer.get_summarizer()
+    old_umask = os.umask(0o077)
+    try:
+        server = SummaryServer(path)
+    finally:
+        os.umask(old_umask)
+    print(f"✅ Summary daemon listening on {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(path)
+
+
+def main():
+    # python summary_daemon.py [--socket PATH] [--backend NAME] [--idle-timeout SECONDS]
+    # The daemon is there to keep the model warm, so it is never unloaded for
+    # idling unless --idle-timeout says otherwise
+    args = sys.argv[1:]
+    path = SOCKET_PATH
+    if "--socket" in args:
+        path = args[args.index("--socket") + 1]
+    if "--backend" in args:
+        summarizer.set_backend(args[args.index("--backend") + 1])
+    summarizer.set_idle_timeout(float(args[args.index("--idle-timeout") + 1]) if "--idle-timeout" in args else 0)
+    serve(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,17 @@ from tkinter.scrolledtext import ScrolledText
 import threading
 import os
 import datetime
+import io
 import webbrowser
-from PIL import Image, ImageDraw, ImageFont, ImageTk
-from newspaper import Article
-from transformers import pipeline
-import nltk
-
-nltk.download('punkt', quiet=True)
+from concurrent.futures import Future
+from PIL import ImageDraw, ImageTk
+from article_fetcher import extract_article
+from boilerplate import prune_boilerplate, pruning_message
+from color_spans import ColorSpans
+from render_cache import CARD_WIDTH, CARD_HEIGHT, load_base_layer, load_overlay, file_digest, content_key, result_cache
+from preview_scheduler import PreviewScheduler
+from summarizer import memory_usage, preload_summarizer, summarize_document
+from text_layout import get_font, wrap_text, draw_layout, layout_bbox, fit_text
 
 TEMPLATE_IMAGE = "tcb-template.png"
 TCB_ICON = "tcb-icon.png"
@@ -22,144 +26,225 @@ if not os.path.exists(OUTPUT_DIR):
 WINDOW_WIDTH = 900
 WINDOW_HEIGHT = 700
 
-summarizer = pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
-
-def extract_article(url):
-    article = Article(url, language='en')
-    article.download()
-    article.parse()
-    return article.title.strip(), article.text.strip()
-
-def summarize_article(text):
-    max_chunk = 800
-    paragraphs = text.split("\n")
-    chunks = []
-    current = ""
-    for para in paragraphs:
-        if len(current) + len(para) < max_chunk:
-            current += " " + para
-        else:
-            chunks.append(current.strip())
-            current = para
-    if current:
-        chunks.append(current.strip())
-
-    summary = " ".join([summarizer(chunk, max_length=80, min_length=20, do_sample=False)[0]['summary_text'] for chunk in chunks])
-    return summary.strip()
-
-def draw_multicolor_text(draw, position, text, font, colors, max_width, max_height, line_spacing_add=0):
-    words = text.split()
-    lines = []
-    line = ''
-    for w in words:
-        test_line = (line + ' ' + w).strip()
-        bbox = draw.textbbox((0,0), test_line, font=font)
-        w_w = bbox[2] - bbox[0]
-        if w_w <= max_width:
-            line = test_line
-        else:
-            if line:
-                lines.append(line)
-            line = w
-    if line:
-        lines.append(line)
-
-    line_h = font.getbbox('A')[3] - font.getbbox('A')[1] + 4 + line_spacing_add
-    total_h = line_h * len(lines)
-    x, y = position
-    start_y = y + max(0, (max_height - total_h)//2)
-
-    color_map = [(255,255,255,255)] * len(text)
-    for start, end, col in colors:
-        for i in range(start, end):
-            if i < len(color_map):
-                color_map[i] = col
-
-    char_index_in_full_text = 0
-    for line_num, line_content in enumerate(lines):
-        bbox = draw.textbbox((0,0), line_content, font=font)
-        line_w = bbox[2] - bbox[0]
-        cur_x = x + (max_width - line_w)//2
-
-        for ch in line_content:
-            if ch == ' ' and (char_index_in_full_text >= len(text) or text[char_index_in_full_text] != ' '):
-                char_w = draw.textbbox((0,0), ch, font=font)[2] - draw.textbbox((0,0), ch, font=font)[0]
-                cur_x += char_w
-                if char_index_in_full_text < len(text) and text[char_index_in_full_text] == ' ':
-                    char_index_in_full_text += 1
-                continue
+MODEL_STATUS_INTERVAL_MS = 5000
 
-            c = color_map[char_index_in_full_text] if char_index_in_full_text < len(color_map) else (255,255,255,255)
-            draw.text((cur_x, start_y), ch, font=font, fill=c)
-            char_w = draw.textbbox((0,0), ch, font=font)[2] - draw.textbbox((0,0), ch, font=font)[0]
-            cur_x += char_w
-            char_index_in_full_text += 1
-        start_y += line_h
+PREVIEW_SCALE = 0.5
+PREVIEW_SIZE = (540, 640)
 
+TITLE_FONT_MIN = 10
+TITLE_FONT_MAX = 80
 
-def generate_photocard(title, bg_path, template_path, font_path, output_path,
-                       title_pos, title_font_size, title_box, title_line_spacing, title_colors,
-                       icon_pos, date_pos,
-                       custom_text_content, custom_text_pos, custom_text_font_size, custom_text_box, custom_text_colors):
-    bg = Image.open(bg_path).convert("RGBA")
-    w_percent = 1080 / float(bg.size[0])
-    h_size = int((float(bg.size[1]) * float(w_percent)))
-    bg = bg.resize((1080, h_size), Image.LANCZOS)
+def summarize_article(text, on_text=None, on_progress=None):
+    return summarize_document(text, max_length=80, min_length=20, on_text=on_text, on_progress=on_progress)
 
-    overlay = Image.open(template_path).convert("RGBA")
+def card_date_str():
+    return datetime.datetime.now().strftime("%d %B, %Y").upper()
 
-    canvas_height = max(bg.size[1], overlay.size[1])
-    canvas = Image.new("RGBA", (1080, canvas_height), (0,0,0,255))
-    canvas.paste(bg, (0,0))
-    canvas.alpha_composite(overlay, (0,0))
 
-    draw = ImageDraw.Draw(canvas)
+def _rects_intersect(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
 
-    if os.path.exists(TCB_ICON):
-        icon = Image.open(TCB_ICON).convert("RGBA")
-        canvas.paste(icon, icon_pos, icon)
 
-    date_font = ImageFont.truetype(font_path, 24)
-    date_str = datetime.datetime.now().strftime("%d %B, %Y").upper()
-    draw.text(date_pos, date_str, font=date_font, fill=(255,255,255,255))
+def _merge_rects(rects):
+    # Union overlapping rectangles so no pixel is restored and redrawn twice
+    merged = []
+    for rect in rects:
+        while True:
+            for other in merged:
+                if _rects_intersect(rect, other):
+                    merged.remove(other)
+                    rect = (min(rect[0], other[0]), min(rect[1], other[1]), max(rect[2], other[2]), max(rect[3], other[3]))
+                    break
+            else:
+                break
+        merged.append(rect)
+    return merged
 
-    font_title = ImageFont.truetype(font_path, title_font_size)
-    draw_multicolor_text(draw, title_pos, title, font_title, title_colors, title_box[0], title_box[1], line_spacing_add=title_line_spacing)
 
-    if custom_text_content.strip():
-        font_custom = ImageFont.truetype(font_path, custom_text_font_size)
-        draw_multicolor_text(draw, custom_text_pos, custom_text_content, font_custom, custom_text_colors, custom_text_box[0], custom_text_box[1], line_spacing_add=0) # No line spacing for custom text yet
+class CardElement:
+    __slots__ = ('name', 'key', 'bbox', 'draw')
 
-    final_img = canvas.crop((0, 0, 1080, 1280))
-    final_img.save(output_path)
-    return output_path, final_img
+    def __init__(self, name, key, bbox, draw):
+        self.name = name
+        self.key = key  # everything the element's pixels depend on
+        self.bbox = bbox
+        self.draw = draw  # draw(image, image_draw, (dx, dy))
 
-def merge_color_ranges(ranges):
-    if not ranges:
-        return []
-    ranges.sort(key=lambda x: x[0])
-    merged = [ranges[0]]
-    for cur in ranges[1:]:
-        last = merged[-1]
-        if cur[0] <= last[1]:
-            if cur[2] == last[2]:
-                merged[-1] = (last[0], max(last[1], cur[1]), last[2])
-            else:
-                merged.append(cur)
+
+class CardRenderer:
+    # Renders cards incrementally. The last canvas and each element's key and
+    # bounding box are kept between renders; when only some elements change,
+    # their old and new rectangles are restored from the cached base layer and
+    # every element overlapping them is redrawn, so small edits cost time in
+    # proportion to the area that changed.
+    def __init__(self):
+        self._base = None
+        self._canvas = None
+        self._elements = {}
+
+    def render(self, title, bg_path, template_path, font_path,
+               title_pos, title_font_size, title_box, title_line_spacing, title_colors,
+               icon_pos, date_pos,
+               custom_text_content, custom_text_pos, custom_text_font_size, custom_text_box, custom_text_colors,
+               title_auto_fit=False, scale=1.0):
+        # All positions and sizes are in full-resolution card pixels; scale lays
+        # the card out and draws it directly at a smaller size (the preview)
+        def px(v):
+            return int(round(v * scale))
+
+        def pt(pos):
+            return (px(pos[0]), px(pos[1]))
+
+        base = load_base_layer(bg_path, template_path, px(CARD_WIDTH))
+        elements = []
+
+        if os.path.exists(TCB_ICON):
+            icon = load_overlay(TCB_ICON, scale)
+            ix, iy = pt(icon_pos)
+            elements.append(CardElement(
+                "icon", (TCB_ICON, ix, iy, scale), (ix, iy, ix + icon.width, iy + icon.height),
+                lambda img, d, off: img.paste(icon, (ix + off[0], iy + off[1]), icon)))
+
+        date_font = get_font(font_path, px(24))
+        date_str = card_date_str()
+        dx, dy = pt(date_pos)
+        date_bbox = date_font.getbbox(date_str)
+        elements.append(CardElement(
+            "date", (font_path, date_str, dx, dy, scale), (dx + date_bbox[0], dy + date_bbox[1], dx + date_bbox[2], dy + date_bbox[3]),
+            lambda img, d, off: d.text((dx + off[0], dy + off[1]), date_str, font=date_font, fill=(255,255,255,255))))
+
+        title_w, title_h = pt(title_box)
+        if title_auto_fit:
+            title_layout = fit_text(title, font_path, title_w, title_h, px(TITLE_FONT_MIN), px(TITLE_FONT_MAX), px(title_line_spacing))
         else:
-            merged.append(cur)
-   
-    final_merged = []
-    if merged:
-        merged.sort(key=lambda x: x[0])
-        final_merged.append(merged[0])
-        for cur in merged[1:]:
-            last = final_merged[-1]
-            if cur[0] <= last[1] and cur[2] == last[2]:
-                final_merged[-1] = (last[0], max(last[1], cur[1]), last[2])
-            else:
-                final_merged.append(cur)
-    return final_merged
+            title_layout = wrap_text(title, get_font(font_path, max(1, px(title_font_size))), title_w, px(title_line_spacing))
+        elements.append(self._text_element(
+            "title", title_layout, pt(title_pos), title_w, title_h, title_colors,
+            (font_path, title, title_font_size, title_auto_fit, title_line_spacing, title_colors.key(), tuple(title_pos), tuple(title_box), scale)))
+
+        if custom_text_content.strip():
+            custom_w, custom_h = pt(custom_text_box)
+            custom_layout = wrap_text(custom_text_content, get_font(font_path, max(1, px(custom_text_font_size))), custom_w) # No line spacing for custom text yet
+            elements.append(self._text_element(
+                "custom", custom_layout, pt(custom_text_pos), custom_w, custom_h, custom_text_colors,
+                (font_path, custom_text_content, custom_text_font_size, custom_text_colors.key(), tuple(custom_text_pos), tuple(custom_text_box), scale)))
+
+        if base is not self._base:
+            self._full_render(base, elements)
+        else:
+            self._partial_render(base, elements)
+        self._base = base
+        self._elements = {el.name: el for el in elements}
+        return self._canvas.crop((0, 0, px(CARD_WIDTH), px(CARD_HEIGHT)))
+
+    def _text_element(self, name, layout, pos, max_w, max_h, colors, key):
+        return CardElement(
+            name, key, layout_bbox(layout, pos, max_w, max_h),
+            lambda img, d, off: draw_layout(d, layout, (pos[0] + off[0], pos[1] + off[1]), max_w, max_h, colors))
+
+    def _full_render(self, base, elements):
+        self._canvas = base.copy()
+        draw = ImageDraw.Draw(self._canvas)
+        for el in elements:
+            el.draw(self._canvas, draw, (0, 0))
+
+    def _partial_render(self, base, elements):
+        damaged = []
+        names = set()
+        for el in elements:
+            names.add(el.name)
+            old = self._elements.get(el.name)
+            if old is not None and old.key == el.key:
+                continue
+            if old is not None and old.bbox:
+                damaged.append(old.bbox)
+            if el.bbox:
+                damaged.append(el.bbox)
+        for name, old in self._elements.items():
+            if name not in names and old.bbox:
+                damaged.append(old.bbox)
+
+        w, h = self._canvas.size
+        clipped = []
+        for x0, y0, x1, y1 in damaged:
+            rect = (max(0, x0), max(0, y0), min(w, x1), min(h, y1))
+            if rect[0] < rect[2] and rect[1] < rect[3]:
+                clipped.append(rect)
+
+        for rect in _merge_rects(clipped):
+            region = base.crop(rect)
+            draw = ImageDraw.Draw(region)
+            for el in elements:
+                if el.bbox and _rects_intersect(el.bbox, rect):
+                    el.draw(region, draw, (-rect[0], -rect[1]))
+            self._canvas.paste(region, rect[:2])
+
+
+def generate_photocard(title, bg_path, template_path, font_path, output_path,
+                       title_pos, title_font_size, title_box, title_line_spacing, title_colors,
+                       icon_pos, date_pos,
+                       custom_text_content, custom_text_pos, custom_text_font_size, custom_text_box, custom_text_colors,
+                       title_auto_fit=False, scale=1.0):
+    # One-shot render; output_path=None skips writing the image to disk
+    final_img = CardRenderer().render(
+        title, bg_path, template_path, font_path,
+        title_pos, title_font_size, title_box, title_line_spacing, title_colors,
+        icon_pos, date_pos,
+        custom_text_content, custom_text_pos, custom_text_font_size, custom_text_box, custom_text_colors,
+        title_auto_fit=title_auto_fit, scale=scale)
+    if output_path:
+        final_img.save(output_path)
+    return output_path, final_img
+
+def card_render_key(params, scale=1.0):
+    # Content hash of everything a render depends on: source files by digest,
+    # colour spans by value, plus the date string that gets drawn
+    parts = []
+    for name in sorted(params):
+        value = params[name]
+        if name in ("bg_path", "template_path", "font_path"):
+            value = file_digest(value)
+        elif isinstance(value, ColorSpans):
+            value = value.key()
+        parts.append((name, value))
+    parts.append(("icon", file_digest(TCB_ICON) if os.path.exists(TCB_ICON) else None))
+    parts.append(("date", card_date_str()))
+    parts.append(("scale", scale))
+    return content_key(parts)
+
+_card_renders = {}
+_card_renders_lock = threading.Lock()
+
+def render_card_png(params):
+    # Full-resolution PNG bytes for a card, reused when nothing has changed.
+    # A caller asking for a card that is already being rendered (finalize
+    # while the idle prerender runs) waits for that render instead of
+    # starting another.
+    key = card_render_key(params)
+    data = result_cache.get(key)
+    if data is not None:
+        return data
+    with _card_renders_lock:
+        future = _card_renders.get(key)
+        owner = future is None
+        if owner:
+            future = _card_renders[key] = Future()
+    if not owner:
+        return future.result()
+    try:
+        _, img = generate_photocard(output_path=None, **params)
+        buf = io.BytesIO()
+        img.save(buf, "PNG")
+        data = buf.getvalue()
+        result_cache.put(key, data)
+        future.set_result(data)
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _card_renders_lock:
+            del _card_renders[key]
+    return data
 
 class TCBWizardApp(tk.Tk):
     def __init__(self):
@@ -179,10 +264,11 @@ class TCBWizardApp(tk.Tk):
         self.title_x = tk.IntVar(value=150)
         self.title_y = tk.IntVar(value=880)
         self.title_font_size = tk.IntVar(value=36)
+        self.title_auto_fit = tk.BooleanVar(value=False)
         self.title_max_w = tk.IntVar(value=700)
         self.title_max_h = tk.IntVar(value=200)
         self.title_line_spacing = tk.IntVar(value=4)
-        self.title_colors = [(0, 10000, (255,255,255,255))]
+        self.title_colors = ColorSpans()
 
         self.icon_x = tk.IntVar(value=800)
         self.icon_y = tk.IntVar(value=20)
@@ -196,7 +282,7 @@ class TCBWizardApp(tk.Tk):
         self.custom_text_font_size = tk.IntVar(value=24)
         self.custom_text_max_w = tk.IntVar(value=700)
         self.custom_text_max_h = tk.IntVar(value=150)
-        self.custom_text_colors = [(0, 10000, (255,255,255,255))] # Default white
+        self.custom_text_colors = ColorSpans() # Default white
 
         self.final_image_path = None
 
@@ -207,6 +293,32 @@ class TCBWizardApp(tk.Tk):
             frame.place(relx=0, rely=0, relwidth=1, relheight=1)
 
         self.show_frame(Step1Frame)
+        # The window is up first; the summarization model loads behind it
+        self.after_idle(self.preload_model)
+
+    def preload_model(self):
+        preload_summarizer(on_ready=lambda: self.after(0, self.model_ready),
+                           on_error=lambda e: self.after(0, self.model_failed, e))
+
+    def model_ready(self):
+        self.frames[Step1Frame].model_label.config(text="Summarizer ready.", fg="green")
+        self.after(MODEL_STATUS_INTERVAL_MS, self.refresh_model_status)
+
+    def refresh_model_status(self):
+        # The model is unloaded after sitting idle and reloads on the next
+        # summary; show where memory stands
+        usage = memory_usage()
+        if usage["loads"]:
+            mb = lambda n: f"{n / (1024 * 1024):.0f} MB" if n else "?"
+            if usage["loaded"]:
+                text, fg = f"Summarizer loaded · {mb(usage['current'])} (peak {mb(usage['peak'])})", "green"
+            else:
+                text, fg = f"Summarizer unloaded while idle · {mb(usage['current'])} (peak {mb(usage['peak'])})", "gray"
+            self.frames[Step1Frame].model_label.config(text=text, fg=fg)
+        self.after(MODEL_STATUS_INTERVAL_MS, self.refresh_model_status)
+
+    def model_failed(self, e):
+        self.frames[Step1Frame].model_label.config(text=f"Summarizer failed to load: {e}", fg="red")
 
     def show_frame(self, frame_class):
         frame = self.frames[frame_class]
@@ -255,6 +367,9 @@ class Step1Frame(tk.Frame):
         self.gen_btn = tk.Button(self, text="Generate Photocard", state="disabled", command=parent.start_generation)
         self.gen_btn.pack(pady=15)
 
+        self.model_label = tk.Label(self, text="Loading summarizer...", fg="gray")
+        self.model_label.pack(pady=5)
+
         def check_ready(*args):
             if parent.news_url.get() and parent.bg_image_path:
                 self.gen_btn.config(state="normal")
@@ -283,7 +398,29 @@ class Step2Frame(tk.Frame):
         self.log_box.see(tk.END)
         self.log_box.config(state="disabled")
 
+    def log_piece(self, piece):
+        self.log_box.config(state="normal")
+        self.log_box.insert(tk.END, piece)
+        self.log_box.see(tk.END)
+        self.log_box.config(state="disabled")
+
     def start_process(self, url, bg_image_path, app):
+        # Extraction and summarization run on a worker thread while the
+        # preview's background layer is decoded on another. Summarization
+        # callbacks are handed to the Tk thread with after(); the editor
+        # opens as soon as the first chunk is summarized and the rest keeps
+        # streaming into it.
+        self.editor_open = False
+        self.stream_pos = None
+        self.progress_var.set(0)
+        app.frames[Step3Frame].reset_summary()
+
+        def warm_preview():
+            try:
+                load_base_layer(bg_image_path, TEMPLATE_IMAGE, int(round(CARD_WIDTH * PREVIEW_SCALE)))
+            except Exception as e:
+                print(f"Background preload failed: {e}")
+
         def task():
             try:
                 self.log("Extracting article from URL...")
@@ -291,35 +428,71 @@ class Step2Frame(tk.Frame):
                 self.progress_var.set(20)
                 self.log(f"Title extracted: {title}")
 
-                self.log("Summarizing article...")
-                summary = summarize_article(full_text)
-                self.progress_var.set(60)
-                self.log("Summary generated.")
-
                 app.title_text = title
-                app.summary_text = summary
+                app.summary_text = ""
                 app.full_text = full_text
 
-                self.progress_var.set(80)
-                self.log("Preparing photocard preview...")
-                self.progress_var.set(100)
-                self.log("Done!")
+                # Summaries come from the pruned text; the full article shown
+                # for copying stays as extracted
+                article_text, pruned = prune_boilerplate(full_text, url)
+                self.log(pruning_message(pruned))
 
-                app.show_frame(Step3Frame)
-                app.frames[Step3Frame].load_preview()
+                self.log("Summarizing article...")
+                summary = summarize_article(
+                    article_text,
+                    on_text=lambda round_no, i, piece: self.after(0, self.stream_piece, round_no, i, piece),
+                    on_progress=lambda done, total: self.after(0, self.show_progress, done, total))
+                self.after(0, self.summary_done, summary)
             except Exception as e:
-                self.log(f"Error: {e}")
-                messagebox.showerror("Error", f"Processing failed: {e}")
-                app.show_frame(Step1Frame)
+                self.after(0, self.process_failed, e)
 
+        if bg_image_path:
+            threading.Thread(target=warm_preview, daemon=True).start()
         threading.Thread(target=task, daemon=True).start()
 
+    def open_editor(self):
+        if self.editor_open:
+            return
+        self.editor_open = True
+        self.log("Preparing photocard preview...")
+        self.parent.show_frame(Step3Frame)
+        self.parent.frames[Step3Frame].load_preview()
+
+    def stream_piece(self, round_no, index, piece):
+        if self.stream_pos != (round_no, index):
+            self.stream_pos = (round_no, index)
+            self.log_piece(f"\n[{'chunk' if round_no == 0 else 'reduce'} {index + 1}] ")
+        self.log_piece(piece)
+        if round_no == 0:
+            self.parent.frames[Step3Frame].append_summary(index, piece)
+
+    def show_progress(self, done, total):
+        self.progress_var.set(20 + 80 * done / total if total else 20)
+        self.parent.frames[Step3Frame].summary_progress(done, total)
+        if done:
+            self.open_editor()
+
+    def summary_done(self, summary):
+        self.progress_var.set(100)
+        self.log("\nSummary generated.")
+        self.log("Done!")
+        self.open_editor()
+        self.parent.frames[Step3Frame].finish_summary(summary)
+
+    def process_failed(self, e):
+        self.log(f"\nError: {e}")
+        if self.editor_open:
+            self.parent.frames[Step3Frame].summary_failed(e)
+            return
+        messagebox.showerror("Error", f"Processing failed: {e}")
+        self.parent.show_frame(Step1Frame)
+
 class Step3Frame(tk.Frame):
     def __init__(self, parent):
         super().__init__(parent)
         self.parent = parent
 
-        self.canvas = tk.Canvas(self, width=540, height=640, bg="black")
+        self.canvas = tk.Canvas(self, width=PREVIEW_SIZE[0], height=PREVIEW_SIZE[1], bg="black")
         self.canvas.pack(side="left", padx=10, pady=10)
 
         control_frame = ttk.Frame(self)
@@ -348,7 +521,8 @@ class Step3Frame(tk.Frame):
         ttk.Scale(self.scrollable_frame, from_=0, to=1280, orient="horizontal", variable=parent.title_y, command=lambda e:self.update_preview()).pack(fill="x")
 
         ttk.Label(self.scrollable_frame, text="Title Font Size:").pack(anchor="w")
-        ttk.Scale(self.scrollable_frame, from_=10, to=80, orient="horizontal", variable=parent.title_font_size, command=lambda e:self.update_preview()).pack(fill="x")
+        ttk.Scale(self.scrollable_frame, from_=TITLE_FONT_MIN, to=TITLE_FONT_MAX, orient="horizontal", variable=parent.title_font_size, command=lambda e:self.update_preview()).pack(fill="x")
+        ttk.Checkbutton(self.scrollable_frame, text="Auto-fit Title Size to Box", variable=parent.title_auto_fit, command=self.update_preview).pack(anchor="w")
 
         ttk.Label(self.scrollable_frame, text="Title Max Width:").pack(anchor="w")
         ttk.Scale(self.scrollable_frame, from_=200, to=900, orient="horizontal", variable=parent.title_max_w, command=lambda e:self.update_preview()).pack(fill="x")
@@ -366,6 +540,15 @@ class Step3Frame(tk.Frame):
         title_color_btn = ttk.Button(self.scrollable_frame, text="Pick Color for Title Selection", command=self.pick_color_for_title_selection)
         title_color_btn.pack(pady=5)
 
+        ttk.Label(self.scrollable_frame, text="--- Summary ---", font=("Arial", 12, "bold")).pack(pady=(20,5))
+        self.summary_status = ttk.Label(self.scrollable_frame, text="")
+        self.summary_status.pack(anchor="w")
+        self.summary_widget = tk.Text(self.scrollable_frame, height=6, width=40, wrap="word", font=("Arial", 11))
+        self.summary_widget.pack(fill="x", padx=5)
+        # Text streamed in so far, to tell whether the editor has changed it
+        self.summary_draft = ""
+        self.summary_chunk = None
+
         ttk.Label(self.scrollable_frame, text="--- Custom Text Settings ---", font=("Arial", 12, "bold")).pack(pady=(20,5))
         ttk.Label(self.scrollable_frame, text="Custom Text:").pack(anchor="w")
         self.custom_text_widget = tk.Text(self.scrollable_frame, height=4, width=40, wrap="word", font=("TiroBangla", 14))
@@ -406,7 +589,11 @@ class Step3Frame(tk.Frame):
         self.custom_text_widget.bind("<<Modified>>", self.on_custom_text_change)
 
         self.preview_img = None
-        self.tk_preview_img = None
+        self.tk_preview_img = ImageTk.PhotoImage("RGBA", PREVIEW_SIZE)
+        self.preview_item = self.canvas.create_image(0, 0, anchor="nw", image=self.tk_preview_img)
+        self.preview_renderer = CardRenderer()
+        self.preview_scheduler = PreviewScheduler(self, self.render_preview, self.show_preview, self.show_preview_error,
+                                                  on_idle=render_card_png)
 
     def on_title_text_change(self, event=None):
         self.title_text_widget.edit_modified(False)
@@ -423,16 +610,17 @@ class Step3Frame(tk.Frame):
             if tag.startswith("color"):
                 text_widget.tag_delete(tag)
 
-    def apply_colors_to_text_widget(self, text_widget, color_list):
+    def apply_colors_to_text_widget(self, text_widget, color_spans):
+        # Only coloured ranges are tagged; default (white) text keeps the
+        # widget's own foreground so it stays readable on its background
         self.clear_text_widget_tags(text_widget)
-        for i, (start, end, color) in enumerate(color_list):
-            tag_name = f"color{i}"
+        text_len = len(text_widget.get("1.0", "end-1c"))
+        for start, end, color in color_spans.painted_runs(0, text_len):
             r,g,b,a = color
             hex_color = f"#{r:02x}{g:02x}{b:02x}"
-            start_idx = f"1.{start}"
-            end_idx = f"1.{end}"
+            tag_name = f"color{hex_color}"
             try:
-                text_widget.tag_add(tag_name, start_idx, end_idx)
+                text_widget.tag_add(tag_name, f"1.0 + {start} chars", f"1.0 + {end} chars")
                 text_widget.tag_config(tag_name, foreground=hex_color)
             except tk.TclError:
                 pass
@@ -455,30 +643,13 @@ class Step3Frame(tk.Frame):
             return
         rgb = tuple(int(x) for x in color_code[0]) + (255,)
 
-        start_char_idx = int(start_idx_str.split('.')[1])
-        end_char_idx = int(end_idx_str.split('.')[1])
-
-        new_colors_temp = []
-        for s,e,c in current_colors:
-            if e <= start_char_idx or s >= end_char_idx:
-                new_colors_temp.append((s,e,c))
-            elif s >= start_char_idx and e <= end_char_idx:
-                pass
-            elif s < start_char_idx < e:
-                new_colors_temp.append((s, start_char_idx, c))
-                if e > end_char_idx: # Also partial overlap on right
-                    new_colors_temp.append((end_char_idx, e, c))
-            elif s < end_char_idx < e:
-                new_colors_temp.append((end_char_idx, e, c))
-            else:
-                pass
-        new_colors_temp.append((start_char_idx, end_char_idx, rgb))
-        final_colors = merge_color_ranges(new_colors_temp)
-        update_callback(final_colors)
-
-        self.apply_colors_to_text_widget(text_widget, final_colors)
-        self.update_preview()
+        # Character offsets into the whole text, so multi-line text colours correctly
+        start_char_idx = len(text_widget.get("1.0", start_idx_str))
+        end_char_idx = len(text_widget.get("1.0", end_idx_str))
 
+        current_colors.paint(start_char_idx, end_char_idx, rgb)
+        self.apply_colors_to_text_widget(text_widget, current_colors)
+        update_callback(current_colors)
 
     def load_preview(self):
         self.title_text_widget.delete("1.0", tk.END)
@@ -490,60 +661,91 @@ class Step3Frame(tk.Frame):
 
         self.update_preview()
 
+    def reset_summary(self):
+        self.summary_widget.delete("1.0", tk.END)
+        self.summary_draft = ""
+        self.summary_chunk = None
+        self.summary_status.config(text="Summarizing...")
+
+    def append_summary(self, index, piece):
+        if self.summary_chunk is not None and index != self.summary_chunk and self.summary_draft:
+            piece = " " + piece.lstrip()
+        elif not self.summary_draft:
+            piece = piece.lstrip()
+        self.summary_chunk = index
+        self.summary_draft += piece
+        self.summary_widget.insert(tk.END, piece)
+
+    def summary_progress(self, done, total):
+        self.summary_status.config(text=f"Summarizing... {done}/{total} chunk(s) done")
+
+    def finish_summary(self, summary):
+        # The final text can differ from the stream after a reduce round;
+        # it replaces the draft unless the editor has already changed it
+        if self.summary_widget.get("1.0", "end-1c") == self.summary_draft:
+            self.summary_widget.delete("1.0", tk.END)
+            self.summary_widget.insert(tk.END, summary)
+            self.summary_draft = summary
+        self.summary_status.config(text="Summary ready.")
+
+    def summary_failed(self, e):
+        self.summary_status.config(text=f"Summarization failed: {e}")
+
+    def card_params(self):
+        # Snapshot of every render input, read on the Tk thread
+        return dict(
+            title=self.parent.title_text,
+            bg_path=self.parent.bg_image_path,
+            template_path=TEMPLATE_IMAGE,
+            font_path=FONT_PATH,
+            title_pos=(self.parent.title_x.get(), self.parent.title_y.get()),
+            title_font_size=self.parent.title_font_size.get(),
+            title_box=(self.parent.title_max_w.get(), self.parent.title_max_h.get()),
+            title_line_spacing=self.parent.title_line_spacing.get(),
+            title_colors=self.parent.title_colors.copy(),
+            icon_pos=(self.parent.icon_x.get(), self.parent.icon_y.get()),
+            date_pos=(self.parent.date_x.get(), self.parent.date_y.get()),
+            custom_text_content=self.parent.custom_text.get(),
+            custom_text_pos=(self.parent.custom_text_x.get(), self.parent.custom_text_y.get()),
+            custom_text_font_size=self.parent.custom_text_font_size.get(),
+            custom_text_box=(self.parent.custom_text_max_w.get(), self.parent.custom_text_max_h.get()),
+            custom_text_colors=self.parent.custom_text_colors.copy(),
+            title_auto_fit=self.parent.title_auto_fit.get()
+        )
+
     def update_preview(self):
-        try:
-            path, img = generate_photocard(
-                self.parent.title_text,
-                self.parent.bg_image_path,
-                TEMPLATE_IMAGE,
-                FONT_PATH,
-                output_path=os.path.join(OUTPUT_DIR, "preview.png"),
-                title_pos=(self.parent.title_x.get(), self.parent.title_y.get()),
-                title_font_size=self.parent.title_font_size.get(),
-                title_box=(self.parent.title_max_w.get(), self.parent.title_max_h.get()),
-                title_line_spacing=self.parent.title_line_spacing.get(),
-                title_colors=self.parent.title_colors,
-                icon_pos=(self.parent.icon_x.get(), self.parent.icon_y.get()),
-                date_pos=(self.parent.date_x.get(), self.parent.date_y.get()),
-                custom_text_content=self.parent.custom_text.get(),
-                custom_text_pos=(self.parent.custom_text_x.get(), self.parent.custom_text_y.get()),
-                custom_text_font_size=self.parent.custom_text_font_size.get(),
-                custom_text_box=(self.parent.custom_text_max_w.get(), self.parent.custom_text_max_h.get()),
-                custom_text_colors=self.parent.custom_text_colors
-            )
-            self.preview_img = img.resize((540, 640), Image.LANCZOS)
-            self.tk_preview_img = ImageTk.PhotoImage(self.preview_img)
-            self.canvas.delete("all")
-            self.canvas.create_image(0,0,anchor="nw", image=self.tk_preview_img)
-        except Exception as e:
-            self.canvas.delete("all")
-            self.canvas.create_text(270, 320, text=f"Preview Error:\n{e}", fill="red", font=("Arial", 14))
-            print(f"Preview Error: {e}")
+        self.preview_scheduler.submit(self.card_params())
+
+    def render_preview(self, params):
+        # Runs on the preview worker thread: lays out and draws at preview
+        # size, with no full-size render and no file written. Only the parts
+        # of the card touched by the change are redrawn
+        return self.preview_renderer.render(scale=PREVIEW_SCALE, **params)
+
+    def show_preview(self, img):
+        self.preview_img = img
+        self.tk_preview_img.paste(img)
+        self.canvas.delete("error")
+        self.canvas.itemconfigure(self.preview_item, state="normal")
+
+    def show_preview_error(self, e):
+        self.canvas.delete("error")
+        self.canvas.itemconfigure(self.preview_item, state="hidden")
+        self.canvas.create_text(PREVIEW_SIZE[0]//2, PREVIEW_SIZE[1]//2, text=f"Preview Error:\n{e}", fill="red", font=("Arial", 14), tags="error")
+        print(f"Preview Error: {e}")
 
     def finalize(self):
         filename = datetime.datetime.now().strftime("TCBPhotocard_%Y%m%d_%H%M%S.png")
         out_path = os.path.join(OUTPUT_DIR, filename)
 
         try:
-            generate_photocard(
-                self.parent.title_text,
-                self.parent.bg_image_path,
-                TEMPLATE_IMAGE,
-                FONT_PATH,
-                output_path=out_path,
-                title_pos=(self.parent.title_x.get(), self.parent.title_y.get()),
-                title_font_size=self.parent.title_font_size.get(),
-                title_box=(self.parent.title_max_w.get(), self.parent.title_max_h.get()),
-                title_line_spacing=self.parent.title_line_spacing.get(),
-                title_colors=self.parent.title_colors,
-                icon_pos=(self.parent.icon_x.get(), self.parent.icon_y.get()),
-                date_pos=(self.parent.date_x.get(), self.parent.date_y.get()),
-                custom_text_content=self.parent.custom_text.get(),
-                custom_text_pos=(self.parent.custom_text_x.get(), self.parent.custom_text_y.get()), # NEW parameter
-                custom_text_font_size=self.parent.custom_text_font_size.get(),
-                custom_text_box=(self.parent.custom_text_max_w.get(), self.parent.custom_text_max_h.get()), # NEW parameter
-                custom_text_colors=self.parent.custom_text_colors
-            )
+            # The full-size card is prerendered once editing pauses, so an
+            # unchanged card is usually already encoded in the cache or
+            # about to be
+            data = render_card_png(self.card_params())
+            self.parent.summary_text = self.summary_widget.get("1.0", "end-1c").strip()
+            with open(out_path, "wb") as f:
+                f.write(data)
             self.parent.final_image_path = out_path
             self.parent.show_frame(Step4Frame)
             self.parent.frames[Step4Frame].load_content()
@@ -605,9 +807,9 @@ class Step4Frame(tk.Frame):
         self.parent.news_url.set("")
         self.parent.bg_image_path = None
         self.parent.final_image_path = None
-        self.parent.title_colors = [(0, 10000, (255,255,255,255))]
+        self.parent.title_colors = ColorSpans()
         self.parent.custom_text.set("Add your custom message here!") # Reset custom text
-        self.parent.custom_text_colors = [(0, 10000, (255,255,255,255))] # Reset custom text colors
+        self.parent.custom_text_colors = ColorSpans() # Reset custom text colors
         self.parent.show_frame(Step1Frame)
         self.parent.frames[Step1Frame].bg_label.config(text="No image selected")
         self.parent.frames[Step1Frame].check_ready()
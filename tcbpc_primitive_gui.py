@@ -5,43 +5,18 @@ import threading
 import os
 import datetime
 from PIL import Image, ImageDraw, ImageFont
-from newspaper import Article
-from transformers import pipeline
-import nltk
-
-nltk.download('punkt', quiet=True)
+from article_fetcher import extract_article
+from boilerplate import prune_boilerplate
+from summarizer import preload_summarizer, summarize_document
 
 # Paths
 TEMPLATE_IMAGE = "tcb-template.png"
 FONT_PATH = "TiroBangla.ttf"
 OUTPUT_DIR = os.path.join(os.path.expanduser("~"), "Pictures")
 
-# Summarizer
-summarizer = pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
-
 # Utility functions
-def extract_article(url):
-    article = Article(url, language='en')
-    article.download()
-    article.parse()
-    return article.title.strip(), article.text.strip()
-
 def summarize_article(text):
-    max_chunk = 800
-    paragraphs = text.split("\n")
-    chunks = []
-    current = ""
-    for para in paragraphs:
-        if len(current) + len(para) < max_chunk:
-            current += " " + para
-        else:
-            chunks.append(current.strip())
-            current = para
-    if current:
-        chunks.append(current.strip())
-
-    summary = " ".join([summarizer(chunk, max_length=80, min_length=20, do_sample=False)[0]['summary_text'] for chunk in chunks])
-    return summary.strip()
+    return summarize_document(text, max_length=80, min_length=20)
 
 def generate_photocard(title, bg_path, template_path, font_path, output_path):
     # Load background and resize to width=1080 while maintaining aspect ratio
@@ -110,7 +85,7 @@ def run_process():
             status.set("Extracting article...")
             title, full_text = extract_article(url)
             status.set("Summarizing article...")
-            summary = summarize_article(full_text)
+            summary = summarize_article(prune_boilerplate(full_text, url)[0])
 
             filename = title[:50].replace(" ", "_").replace("/", "-") + ".png"
             output_path = os.path.join(OUTPUT_DIR, filename)
@@ -153,7 +128,8 @@ bg_label = tk.Label(root, text="No background selected")
 bg_label.pack()
 
 status = tk.StringVar()
-status.set("Ready.")
+LOADING_STATUS = "Loading summarizer..."
+status.set(LOADING_STATUS)
 status_label = tk.Label(root, textvariable=status, fg="green")
 status_label.pack()
 
@@ -174,4 +150,13 @@ full_box.pack(fill="x", padx=10)
 copy2 = tk.Button(root, text="Copy Full Text", command=lambda: root.clipboard_append(full_box.get("1.0", tk.END)))
 copy2.pack()
 
+def loading_finished(message):
+    # Leave the status of a run the editor has already started alone
+    if status.get() == LOADING_STATUS:
+        status.set(message)
+
+# Show the window first and load the summarization model behind it
+preload_summarizer(on_ready=lambda: root.after(0, loading_finished, "Ready."),
+                   on_error=lambda e: root.after(0, loading_finished, f"❌ Summarizer failed to load: {e}"))
+
 root.mainloop()
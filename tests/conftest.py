@@ -0,0 +1,58 @@
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeTokenizer:
+    # One token per word, like a very small fast tokenizer
+    is_fast = True
+
+    def __call__(self, texts, truncation=False, return_offsets_mapping=False, **kwargs):
+        if isinstance(texts, str):
+            if return_offsets_mapping:
+                return {"offset_mapping": [m.span() for m in re.finditer(r"\S+", texts)]}
+            return {"input_ids": [0] * len(texts.split())}
+        return {"input_ids": [[0] * len(t.split()) for t in texts]}
+
+    def encode(self, text, add_special_tokens=True):
+        return [0] * len(text.split())
+
+
+class FakePipeline:
+    # Summarizes a text to its first three words; records every call
+    tokenizer = FakeTokenizer()
+
+    def __init__(self):
+        self.calls = []
+
+    def summarize(self, text):
+        return {"summary_text": " ".join(text.split()[:3])}
+
+    def __call__(self, texts, **kwargs):
+        self.calls.append(texts)
+        if isinstance(texts, str):
+            return [self.summarize(texts)]
+        return [self.summarize(t) for t in texts]
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    import summarizer
+    model = FakePipeline()
+    monkeypatch.setattr(summarizer, "load_pipeline", lambda name, backend: model)
+    monkeypatch.setattr(summarizer, "load_tokenizer", lambda name: model.tokenizer)
+    summarizer.unload_summarizer()
+
+    def stream_one(pipe, text, gen_kwargs, on_text):
+        out = pipe(text, **gen_kwargs)[0]
+        for word in out["summary_text"].split():
+            on_text(word + " ")
+        return out
+
+    monkeypatch.setattr(summarizer, "_stream_one", stream_one)
+    yield model
+    summarizer.unload_summarizer()
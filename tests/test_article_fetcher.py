@@ -0,0 +1,100 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import article_fetcher
+from article_cache import ArticleCache
+from article_fetcher import ArticleFetcher
+
+pytest.importorskip("requests")
+
+DELAY = 0.2
+
+
+class SlowServer(ThreadingHTTPServer):
+    # Answers every page after DELAY seconds and records how many requests
+    # each Host header had in flight at once, plus when each one finished
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SlowHandler)
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak = {}
+        self.finished = {}
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        host = self.headers["Host"].split(":")[0]
+        with server.lock:
+            server.active[host] = server.active.get(host, 0) + 1
+            server.peak[host] = max(server.peak.get(host, 0), server.active[host])
+        time.sleep(DELAY)
+        body = f"<html><title>{self.path}</title><body>Story at {self.path}</body></html>".encode("utf-8")
+        if self.headers.get("If-None-Match") == f'"{self.path}"':
+            self.send_response(304)
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", f'"{self.path}"')
+            self.end_headers()
+            self.wfile.write(body)
+        with server.lock:
+            server.active[host] -= 1
+            server.finished.setdefault(host, []).append(time.perf_counter())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(article_fetcher, "parse_article", lambda url, html, lang="en": (url, html))
+    server = SlowServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def urls(server, host, count):
+    return [f"http://{host}:{server.server_address[1]}/{host}/{n}" for n in range(count)]
+
+
+def test_downloads_run_concurrently_within_the_per_host_cap(server):
+    fetcher = ArticleFetcher(workers=4, per_host_limit=2)
+    try:
+        busy = urls(server, "127.0.0.1", 6)
+        other = urls(server, "localhost", 2)
+        start = time.perf_counter()
+        results = fetcher.extract_many(busy + other)
+        elapsed = time.perf_counter() - start
+    finally:
+        fetcher.close()
+
+    assert not [r for r in results if isinstance(r, Exception)]
+    assert server.peak == {"127.0.0.1": 2, "localhost": 2}
+    # Three rounds of two for the busy site, not eight requests in a row
+    assert elapsed < 6 * DELAY
+    # The other site is not stuck behind the busy site's queue
+    assert max(server.finished["localhost"]) - start < 2 * DELAY
+
+
+def test_cached_pages_are_revalidated(server, tmp_path):
+    cache = ArticleCache(str(tmp_path / "articles.sqlite3"))
+    url = urls(server, "127.0.0.1", 1)[0]
+    fetcher = ArticleFetcher(cache=cache, fresh_seconds=0)
+    try:
+        first = fetcher.extract(url)
+        second = fetcher.extract(url)
+    finally:
+        fetcher.close()
+    assert first == second
+    stats = cache.stats()
+    assert (stats["misses"], stats["revalidated"]) == (1, 1)
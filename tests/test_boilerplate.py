@@ -0,0 +1,16 @@
+from boilerplate import load_rules, prune_boilerplate
+
+
+def test_related_headings_are_pruned_but_body_text_is_kept():
+    text = "\n".join([
+        "Police said the suspects were arrested on Tuesday night in the capital.",
+        "Related stories",
+        "Related: Court hears appeal in fraud case",
+        "Related charges were filed against two other men later that week.",
+    ])
+    cleaned, stats = prune_boilerplate(text, rules=load_rules())
+    assert cleaned.splitlines() == [
+        "Police said the suspects were arrested on Tuesday night in the capital.",
+        "Related charges were filed against two other men later that week.",
+    ]
+    assert stats["patterns"] == 2
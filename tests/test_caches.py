@@ -0,0 +1,39 @@
+import sqlite3
+
+from article_cache import ArticleCache
+from summary_cache import SummaryCache
+
+
+def test_summary_cache_counts_and_evicts_least_recently_used(tmp_path):
+    cache = SummaryCache(str(tmp_path / "summaries.sqlite3"), max_bytes=20)
+    cache.put("a", "x" * 8)
+    cache.put("b", "y" * 8)
+    assert cache.get("a") == "x" * 8
+    cache.put("c", "z" * 8)
+    # "b" was used least recently
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 8 and cache.get("c") == "z" * 8
+    assert cache.stats() == {"hits": 3, "misses": 1, "entries": 2, "bytes": 16}
+    cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "entries": 0, "bytes": 0}
+
+
+def test_article_cache_round_trip_and_stats(tmp_path):
+    cache = ArticleCache(str(tmp_path / "articles.sqlite3"))
+    cache.put("https://Example.com/story?utm_source=x#top", "<p>hi</p>", "utf-8", '"e1"', None, "en", "T", "hi")
+    page = cache.get("https://example.com/story")
+    assert (page["html"], page["etag"], page["title"], page["text"]) == (b"<p>hi</p>", '"e1"', "T", "hi")
+    cache.count("hits")
+    cache.count("revalidated")
+    assert cache.stats() == {"hits": 1, "revalidated": 1, "misses": 0, "entries": 1, "bytes": 11}
+
+
+def test_existing_summary_database_still_opens(tmp_path):
+    path = str(tmp_path / "summaries.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE summaries (key TEXT PRIMARY KEY, summary TEXT NOT NULL, "
+                 "size INTEGER NOT NULL, last_used REAL NOT NULL)")
+    conn.execute("INSERT INTO summaries VALUES ('k', 'kept', 4, 0)")
+    conn.commit()
+    conn.close()
+    assert SummaryCache(path).get("k") == "kept"
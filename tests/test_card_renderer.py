@@ -0,0 +1,108 @@
+import os
+import random
+
+import pytest
+from PIL import Image, ImageChops
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TITLES = ["Flood waters recede as relief reaches the northern districts",
+          "Budget brief: what changes for small traders this year",
+          "ঢাকায় বন্যা পরিস্থিতির অবনতি, বাড়ছে পানি"]
+CUSTOM_TEXTS = ["Add your custom message here!", "", "সূত্র: স্টাফ রিপোর্টার", "Source: staff correspondent"]
+
+
+@pytest.fixture
+def gui(monkeypatch, tmp_path):
+    monkeypatch.chdir(REPO)
+    import tcbpc_gui
+    # Noise shows any region restored from the wrong place
+    bg = tmp_path / "background.png"
+    Image.effect_noise((1080, 1280), 64).convert("RGB").save(bg)
+    return tcbpc_gui, str(bg)
+
+
+def base_params(tcbpc_gui, bg):
+    from color_spans import ColorSpans
+    return dict(
+        title=TITLES[0], bg_path=bg, template_path=tcbpc_gui.TEMPLATE_IMAGE, font_path=tcbpc_gui.FONT_PATH,
+        title_pos=(150, 880), title_font_size=36, title_box=(700, 200), title_line_spacing=4,
+        title_colors=ColorSpans(), icon_pos=(800, 20), date_pos=(800, 1240),
+        custom_text_content=CUSTOM_TEXTS[0], custom_text_pos=(150, 500), custom_text_font_size=24,
+        custom_text_box=(700, 150), custom_text_colors=ColorSpans(), title_auto_fit=False)
+
+
+def edit(params, rng):
+    params = dict(params)
+    choice = rng.randrange(9)
+    if choice == 0:
+        params["title"] = rng.choice(TITLES)
+    elif choice == 1:
+        params["title_pos"] = (rng.randrange(0, 400), rng.randrange(600, 1100))
+    elif choice == 2:
+        params["title_font_size"] = rng.randrange(14, 70)
+    elif choice == 3:
+        params["title_auto_fit"] = not params["title_auto_fit"]
+    elif choice == 4:
+        params["title_box"] = (rng.randrange(200, 900), rng.randrange(60, 300))
+    elif choice == 5:
+        colors = params["title_colors"].copy()
+        start = rng.randrange(0, 20)
+        colors.paint(start, start + rng.randrange(1, 20), (rng.randrange(256), rng.randrange(256), 0, 255))
+        params["title_colors"] = colors
+    elif choice == 6:
+        params["custom_text_content"] = rng.choice(CUSTOM_TEXTS)
+    elif choice == 7:
+        params["custom_text_pos"] = (rng.randrange(0, 500), rng.randrange(100, 700))
+        params["custom_text_font_size"] = rng.randrange(12, 48)
+    else:
+        params["icon_pos"] = (rng.randrange(0, 900), rng.randrange(0, 200))
+        params["date_pos"] = (rng.randrange(0, 800), rng.randrange(1100, 1250))
+    return params
+
+
+@pytest.mark.parametrize("scale", [1.0, 0.5])
+def test_partial_render_matches_a_full_render(gui, scale):
+    tcbpc_gui, bg = gui
+    rng = random.Random(7)
+    renderer = tcbpc_gui.CardRenderer()
+    params = base_params(tcbpc_gui, bg)
+    renderer.render(scale=scale, **params)
+    for step in range(40):
+        params = edit(params, rng)
+        partial = renderer.render(scale=scale, **params)
+        full = tcbpc_gui.CardRenderer().render(scale=scale, **params)
+        assert ImageChops.difference(partial.convert("RGBA"), full.convert("RGBA")).getbbox() is None, \
+            f"step {step} at scale {scale}"
+
+
+def test_merge_rects_leaves_no_overlaps(gui):
+    tcbpc_gui, _ = gui
+    rng = random.Random(3)
+    rects = []
+    for _ in range(30):
+        x, y = rng.randrange(0, 500), rng.randrange(0, 500)
+        rects.append((x, y, x + rng.randrange(1, 120), y + rng.randrange(1, 120)))
+    merged = tcbpc_gui._merge_rects(rects)
+    for i, a in enumerate(merged):
+        assert not any(tcbpc_gui._rects_intersect(a, b) for b in merged[i + 1:])
+    # Every input rectangle lies inside one merged rectangle
+    for r in rects:
+        assert any(m[0] <= r[0] and m[1] <= r[1] and r[2] <= m[2] and r[3] <= m[3] for m in merged)
+
+
+def test_layout_bbox_contains_every_painted_pixel(gui):
+    from PIL import ImageDraw
+    from color_spans import ColorSpans
+    from text_layout import draw_layout, get_font, layout_bbox, wrap_text
+    tcbpc_gui, _ = gui
+    # Drawn in one run and split into many colour runs
+    striped = ColorSpans.from_ranges([(i, i + 2, (255, 0, 0, 255)) for i in range(0, 60, 4)])
+    for text in TITLES + ["Wavy jiggly glyphs: fj gy Qp", "ঁ ং ৃ ্য কী কু"]:
+        for size, colors in [(size, colors) for size in range(10, 81, 7) for colors in (ColorSpans(), striped)]:
+            layout = wrap_text(text, get_font(tcbpc_gui.FONT_PATH, size), 500, 4)
+            canvas = Image.new("RGBA", (900, 900), (0, 0, 0, 0))
+            draw_layout(ImageDraw.Draw(canvas), layout, (200, 200), 500, 400, colors)
+            painted = canvas.getbbox()
+            box = layout_bbox(layout, (200, 200), 500, 400)
+            assert box[0] <= painted[0] and box[1] <= painted[1], (text, size)
+            assert painted[2] <= box[2] and painted[3] <= box[3], (text, size)
@@ -0,0 +1,94 @@
+from color_spans import DEFAULT_TEXT_COLOR, ColorSpans
+
+RED = (255, 0, 0, 255)
+BLUE = (0, 0, 255, 255)
+
+
+def covers(spans, start, end):
+    runs = list(spans.runs(start, end))
+    assert runs[0][0] == start and runs[-1][1] == end
+    assert all(a[1] == b[0] for a, b in zip(runs, runs[1:]))
+    assert all(s < e for s, e, _ in runs)
+    return runs
+
+
+def test_paint_inside_a_span():
+    spans = ColorSpans()
+    spans.paint(3, 6, RED)
+    assert covers(spans, 0, 10) == [(0, 3, DEFAULT_TEXT_COLOR), (3, 6, RED), (6, 10, DEFAULT_TEXT_COLOR)]
+    spans.paint(4, 5, BLUE)
+    assert covers(spans, 0, 10) == [(0, 3, DEFAULT_TEXT_COLOR), (3, 4, RED), (4, 5, BLUE), (5, 6, RED),
+                                    (6, 10, DEFAULT_TEXT_COLOR)]
+
+
+def test_paint_across_span_boundaries():
+    spans = ColorSpans.from_ranges([(2, 5, RED), (7, 9, BLUE)])
+    spans.paint(4, 8, BLUE)
+    assert covers(spans, 0, 12) == [(0, 2, DEFAULT_TEXT_COLOR), (2, 4, RED), (4, 9, BLUE),
+                                    (9, 12, DEFAULT_TEXT_COLOR)]
+
+
+def test_paint_over_the_whole_text():
+    spans = ColorSpans.from_ranges([(2, 5, RED), (7, 9, BLUE)])
+    spans.paint(0, 12, RED)
+    assert covers(spans, 0, 12) == [(0, 12, RED)]
+    assert len(spans) == 2
+
+
+def test_adjacent_equal_colours_merge():
+    spans = ColorSpans()
+    spans.paint(2, 4, RED)
+    spans.paint(4, 6, RED)
+    spans.paint(0, 2, RED)
+    assert spans.key() == ((0, RED), (6, DEFAULT_TEXT_COLOR))
+    spans.paint(0, 6, DEFAULT_TEXT_COLOR)
+    assert spans.key() == ((0, DEFAULT_TEXT_COLOR),)
+
+
+def test_runs_cover_a_window_exactly():
+    spans = ColorSpans.from_ranges([(2, 5, RED), (7, 9, BLUE)])
+    assert covers(spans, 3, 8) == [(3, 5, RED), (5, 7, DEFAULT_TEXT_COLOR), (7, 8, BLUE)]
+    assert list(spans.runs(4, 4)) == []
+
+
+def test_painted_runs_skip_the_default_colour():
+    spans = ColorSpans.from_ranges([(2, 5, RED)])
+    assert list(spans.painted_runs(0, 10)) == [(2, 5, RED)]
+    assert list(ColorSpans().painted_runs(0, 10)) == []
+    assert list(spans.copy().painted_runs(0, 10)) == [(2, 5, RED)]
+
+
+class FakeTextWidget:
+    def __init__(self, text):
+        self.text = text
+        self.tags = {}
+
+    def get(self, start, end):
+        return self.text
+
+    def tag_names(self):
+        return list(self.tags)
+
+    def tag_delete(self, name):
+        del self.tags[name]
+
+    def tag_add(self, name, start, end):
+        self.tags.setdefault(name, []).append((start, end))
+
+    def tag_config(self, name, **options):
+        pass
+
+
+def test_editor_tags_only_coloured_text():
+    # Untagged text keeps the widget's own foreground; tagging the default
+    # white would make it invisible on the white text box
+    from tcbpc_gui import Step3Frame
+
+    class Frame:
+        clear_text_widget_tags = Step3Frame.clear_text_widget_tags
+
+    widget = FakeTextWidget("Breaking news tonight")
+    Step3Frame.apply_colors_to_text_widget(Frame(), widget, ColorSpans())
+    assert widget.tags == {}
+    Step3Frame.apply_colors_to_text_widget(Frame(), widget, ColorSpans.from_ranges([(0, 8, RED)]))
+    assert widget.tags == {"color#ff0000": [("1.0 + 0 chars", "1.0 + 8 chars")]}
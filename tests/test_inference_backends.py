@@ -0,0 +1,76 @@
+import os
+import sys
+import types
+
+import pytest
+
+import inference_backends
+
+
+def test_missing_model_names_it_instead_of_downloading(monkeypatch):
+    monkeypatch.setattr(inference_backends, "ALLOW_MODEL_DOWNLOAD", False)
+    calls = []
+
+    def loader(name, **kwargs):
+        calls.append(kwargs)
+        raise OSError("not cached")
+
+    with pytest.raises(inference_backends.ModelNotCachedError, match="some/model"):
+        inference_backends._from_local(loader, "some/model")
+    assert calls == [{"local_files_only": True}]
+
+
+def test_download_needs_opt_in(monkeypatch):
+    monkeypatch.setattr(inference_backends, "ALLOW_MODEL_DOWNLOAD", True)
+
+    def loader(name, local_files_only=False):
+        if local_files_only:
+            raise OSError("not cached")
+        return "downloaded"
+
+    assert inference_backends._from_local(loader, "some/model") == "downloaded"
+
+
+def test_interrupted_onnx_export_is_redone(monkeypatch, tmp_path):
+    exports = []
+
+    class FakeORTModel:
+        @classmethod
+        def from_pretrained(cls, name, export=False, local_files_only=False):
+            if export:
+                exports.append(name)
+            return cls()
+
+        def save_pretrained(self, path):
+            for name in ("encoder_model.onnx", "decoder_model.onnx", "config.json"):
+                open(os.path.join(path, name), "w").close()
+
+    optimum = types.ModuleType("optimum")
+    onnxruntime = types.ModuleType("optimum.onnxruntime")
+    onnxruntime.ORTModelForSeq2SeqLM = FakeORTModel
+    monkeypatch.setitem(sys.modules, "optimum", optimum)
+    monkeypatch.setitem(sys.modules, "optimum.onnxruntime", onnxruntime)
+    monkeypatch.setattr(inference_backends, "ONNX_DIR", str(tmp_path))
+
+    # An earlier export stopped after writing one graph
+    partial = tmp_path / "some--model"
+    partial.mkdir()
+    (partial / "encoder_model.onnx").write_text("")
+
+    inference_backends._load_onnx_model("some/model")
+    assert exports == ["some/model"]
+    assert sorted(os.listdir(partial)) == ["config.json", "decoder_model.onnx", "encoder_model.onnx"]
+    assert os.listdir(tmp_path) == ["some--model"]
+
+    inference_backends._load_onnx_model("some/model")
+    assert exports == ["some/model"]
+
+
+def test_low_cpu_mem_usage_only_with_accelerate(monkeypatch):
+    import importlib.util
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec",
+                        lambda name, *args: None if name == "accelerate" else find_spec(name, *args))
+    assert inference_backends._model_load_kwargs() == {}
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name, *args: object())
+    assert inference_backends._model_load_kwargs() == {"low_cpu_mem_usage": True}
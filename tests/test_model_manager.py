@@ -0,0 +1,27 @@
+import time
+
+from model_manager import ModelManager
+
+
+def test_hold_longer_than_the_timeout_does_not_spin(monkeypatch):
+    manager = ModelManager(lambda: object(), idle_timeout=0.1)
+    expiries = []
+    expire = manager._expire
+    monkeypatch.setattr(manager, "_expire", lambda: (expiries.append(1), expire()))
+
+    with manager.use():
+        time.sleep(0.5)
+        assert manager.is_loaded()
+    assert len(expiries) <= 1
+
+    # Released: unloaded once the timeout has passed
+    time.sleep(0.3)
+    assert not manager.is_loaded()
+    assert manager.unloads == 1
+
+
+def test_quick_lookups_still_expire():
+    manager = ModelManager(lambda: object(), idle_timeout=0.1)
+    manager.get()
+    time.sleep(0.3)
+    assert not manager.is_loaded()
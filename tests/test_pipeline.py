@@ -0,0 +1,56 @@
+import time
+
+from pipeline import Pipeline, Stage, format_stats
+
+
+# Stage functions live at module level so the spawned render processes can
+# import them
+def fetch(n):
+    time.sleep(0.01 * (n % 3))
+    return n
+
+
+def summarize(n):
+    if n == 2:
+        raise ValueError("cannot summarize 2")
+    return n * 10
+
+
+def render(n):
+    return f"card-{n}"
+
+
+def test_results_keep_input_order_and_failures_pass_through():
+    pipeline = Pipeline([
+        Stage("fetch", fetch, workers=3),
+        Stage("summarize", summarize),
+        Stage("render", render, workers=2, processes=True),
+    ], queue_size=2)
+    seen = []
+    results = pipeline.run(range(6), on_result=lambda n, result: seen.append(n))
+
+    assert results[:2] == ["card-0", "card-10"]
+    assert isinstance(results[2], ValueError)
+    assert results[3:] == ["card-30", "card-40", "card-50"]
+    assert sorted(seen) == list(range(6))
+
+    stats = {s["stage"]: s for s in pipeline.stats()}
+    assert (stats["fetch"]["done"], stats["fetch"]["failed"]) == (6, 0)
+    assert (stats["summarize"]["done"], stats["summarize"]["failed"]) == (5, 1)
+    # The failed item skipped rendering
+    assert (stats["render"]["done"], stats["render"]["failed"]) == (5, 0)
+    assert all(s["queued"] == 0 and s["active"] == 0 for s in stats.values())
+    assert "summarize: 0 queued, 0 active, 5 done, 1 failed" in format_stats(pipeline.stats())
+
+
+def test_empty_run_shuts_down():
+    pipeline = Pipeline([Stage("fetch", fetch, workers=2), Stage("render", render, processes=True)])
+    assert pipeline.run([]) == []
+
+
+# Spawned workers re-import the main module, so a direct run must stay
+# behind this guard: python -m tests.test_pipeline from the repository root
+if __name__ == "__main__":
+    test_results_keep_input_order_and_failures_pass_through()
+    test_empty_run_shuts_down()
+    print("ok")
@@ -0,0 +1,60 @@
+import threading
+import time
+
+from PIL import Image
+
+from preview_scheduler import PreviewScheduler
+
+
+class ImmediateWidget:
+    def after(self, delay, func, *args):
+        func(*args)
+
+
+def test_idle_work_does_not_delay_the_next_preview():
+    idle_started = threading.Event()
+    release_idle = threading.Event()
+    delivered = []
+    second_done = threading.Event()
+
+    def on_idle(params):
+        idle_started.set()
+        release_idle.wait(5)
+
+    def on_done(result):
+        delivered.append(result)
+        if result == "second":
+            second_done.set()
+
+    scheduler = PreviewScheduler(ImmediateWidget(), lambda params: params, on_done, on_idle=on_idle, idle_delay=0.05)
+    scheduler.submit("first")
+    assert idle_started.wait(2)
+    scheduler.submit("second")
+    try:
+        # Delivered while the idle task is still running
+        assert second_done.wait(2)
+    finally:
+        release_idle.set()
+    assert delivered == ["first", "second"]
+
+
+def test_finalize_waits_for_the_render_in_flight(monkeypatch):
+    import tcbpc_gui
+    calls = []
+
+    def slow_render(output_path=None, **params):
+        calls.append(params)
+        time.sleep(0.2)
+        return None, Image.new("RGB", (4, 4))
+
+    monkeypatch.setattr(tcbpc_gui, "generate_photocard", slow_render)
+    monkeypatch.setattr(tcbpc_gui, "card_render_key", lambda params: "test-card-" + params["title"])
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(tcbpc_gui.render_card_png({"title": "a"})))
+               for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert len(set(results)) == 1
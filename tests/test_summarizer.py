@@ -0,0 +1,69 @@
+import summarizer
+
+
+def words(n, word="word"):
+    return " ".join([word] * n)
+
+
+def test_streamed_chunks_arrive_in_article_order(fake_model):
+    # The last chunk is short enough to be kept as it is; it must still
+    # stream after the generated ones
+    chunks = [words(200, "alpha"), words(200, "beta"), words(10, "gamma")]
+    streamed = []
+    finished = []
+    results = summarizer.summarize_chunks(chunks, 150, 40, on_text=lambda i, piece: streamed.append(i),
+                                          on_chunk=lambda i, summary: finished.append(i))
+    assert streamed == sorted(streamed)
+    assert finished == [0, 1, 2]
+    assert results == ["alpha alpha alpha", "beta beta beta", chunks[2]]
+
+
+def long_article():
+    return " ".join(f"Sentence number {n} talks about topic {n % 7} in some detail." for n in range(400))
+
+
+def test_map_stage_matches_chunk_by_chunk_summaries(fake_model):
+    text = long_article()
+    chunks = summarizer.chunk_text(text)
+    assert len(chunks) > 2
+    sequential = " ".join(summarizer.summarize_chunks([chunk], 150, 40)[0] for chunk in chunks)
+    batched = summarizer.summarize_document(text, 150, 40, mode="concat", method="abstractive", use_cache=False,
+                                            use_daemon=False)
+    assert batched == sequential
+
+
+def test_model_is_never_called_concurrently(fake_model):
+    import threading
+    import time
+    active = []
+    overlaps = []
+    summarize = fake_model.summarize
+
+    def tracked(text):
+        active.append(text)
+        if len(active) > 1:
+            overlaps.append(len(active))
+        time.sleep(0.01)
+        active.pop()
+        return summarize(text)
+
+    fake_model.summarize = tracked
+    threads = [threading.Thread(target=summarizer.summarize_document,
+                                args=(long_article(), 150, 40),
+                                kwargs=dict(method="abstractive", use_cache=False, use_daemon=False))
+               for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert fake_model.calls
+    assert not overlaps
+
+
+def test_counting_tokens_does_not_load_the_model(fake_model):
+    summarizer.unload_summarizer()
+    loads = summarizer.memory_usage()["loads"]
+    assert summarizer.count_tokens("four words of text") == 4
+    assert summarizer.chunk_text(long_article())
+    assert not summarizer.is_summarizer_ready()
+    assert summarizer.memory_usage()["loads"] == loads
@@ -0,0 +1,50 @@
+import json
+import socket
+import threading
+
+import pytest
+
+import summarizer
+import summary_daemon
+
+
+def fake_daemon(monkeypatch, events):
+    # The daemon reads the request, sends `events` and hangs up
+    def connect(path=None):
+        client, server = socket.socketpair()
+
+        def serve():
+            with server, server.makefile("rw", encoding="utf-8") as f:
+                f.readline()
+                for event in events:
+                    f.write(json.dumps(event) + "\n")
+                f.flush()
+
+        threading.Thread(target=serve, daemon=True).start()
+        return client
+
+    monkeypatch.setattr(summary_daemon, "_connect", connect)
+
+
+def long_article():
+    return " ".join(f"Sentence number {n} talks about topic {n % 7} in some detail." for n in range(300))
+
+
+def test_hang_up_after_streaming_started_is_not_retried_locally(monkeypatch, fake_model):
+    fake_daemon(monkeypatch, [{"event": "text", "round": 0, "chunk": 0, "piece": "Partial "}])
+    pieces = []
+    with pytest.raises(summary_daemon.DaemonConnectionLost):
+        summarizer.summarize_document(long_article(), 150, 40, method="abstractive", use_cache=False,
+                                      on_text=lambda r, i, piece: pieces.append(piece))
+    assert pieces == ["Partial "]
+    assert fake_model.calls == []
+
+
+def test_hang_up_before_any_event_falls_back_to_local(monkeypatch, fake_model):
+    fake_daemon(monkeypatch, [])
+    pieces = []
+    summary = summarizer.summarize_document(long_article(), 150, 40, method="abstractive", use_cache=False,
+                                            on_text=lambda r, i, piece: pieces.append(piece))
+    assert summary
+    assert pieces
+    assert fake_model.calls
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+from text_layout import fit_text, get_font, wrap_text
+
+FONT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "TiroBangla.ttf")
+
+
+def fits(layout, max_width, max_height):
+    return layout.width <= max_width and layout.height <= max_height
+
+
+@pytest.mark.parametrize("text, box", [
+    ("Flood waters recede as relief reaches the northern districts", (700, 200)),
+    ("Budget brief: what changes for small traders this year", (400, 300)),
+    ("ঢাকায় বন্যা পরিস্থিতির অবনতি, বাড়ছে পানি", (500, 120)),
+    ("Short", (120, 200)),
+])
+def test_fit_text_picks_the_largest_size_that_fits(text, box):
+    max_width, max_height = box
+    layout = fit_text(text, FONT, max_width, max_height, 10, 80, 4)
+    best = layout.font.size
+    assert 10 < best < 80
+    assert fits(layout, max_width, max_height)
+    assert not fits(wrap_text(text, get_font(FONT, best + 1), max_width, 4), max_width, max_height)
+
+
+def test_fit_text_falls_back_to_the_minimum_size():
+    text = "A headline far too long for this box " * 10
+    layout = fit_text(text, FONT, 200, 40, 10, 80, 4)
+    assert layout.font.size == 10
+    assert not fits(layout, 200, 40)
@@ -0,0 +1,179 @@
+import re
+from functools import lru_cache
+from PIL import ImageFont
+
+
+@lru_cache(maxsize=32)
+def get_font(font_path, size):
+    return ImageFont.truetype(font_path, size)
+
+
+@lru_cache(maxsize=8192)
+def _run_advance(font_path, size, run):
+    return get_font(font_path, size).getlength(run)
+
+
+def text_advance(font, run):
+    # Shaped advance of a whole run, cached per font file and size
+    return _run_advance(font.path, font.size, run)
+
+
+@lru_cache(maxsize=1024)
+def _run_ink(font_path, size, run):
+    return get_font(font_path, size).getbbox(run)
+
+
+@lru_cache(maxsize=256)
+def _line_height(font_path, size):
+    bbox = get_font(font_path, size).getbbox('A')
+    return bbox[3] - bbox[1] + 4
+
+
+class TextLine:
+    __slots__ = ('spans', 'text', 'width')
+
+    def __init__(self, source, spans, width):
+        self.spans = spans
+        self.text = ' '.join(source[s:e] for s, e in spans)
+        self.width = width
+
+
+class TextLayout:
+    # Wrapped lines of one text in one font; drawing reuses the measured widths
+    def __init__(self, text, font, lines, line_height):
+        self.text = text
+        self.font = font
+        self.lines = lines
+        self.line_height = line_height
+
+    @property
+    def height(self):
+        return self.line_height * len(self.lines)
+
+    @property
+    def width(self):
+        return max((line.width for line in self.lines), default=0)
+
+
+def _break_lines(text, font, max_width):
+    # Greedy wrap from cumulative word advances; each distinct word and the
+    # space are measured once per font, and explicit newlines start a new line.
+    # Yields (word spans, line width) without building any line objects
+    space_w = text_advance(font, ' ')
+    line = []
+    line_w = 0
+    for m in re.finditer(r'\S+|\n', text):
+        if m.group() == '\n':
+            yield line, line_w
+            line = []
+            line_w = 0
+            continue
+        word_w = text_advance(font, m.group())
+        if not line:
+            line = [m.span()]
+            line_w = word_w
+        elif line_w + space_w + word_w <= max_width:
+            line.append(m.span())
+            line_w += space_w + word_w
+        else:
+            yield line, line_w
+            line = [m.span()]
+            line_w = word_w
+    if line:
+        yield line, line_w
+
+
+def wrap_text(text, font, max_width, line_spacing_add=0):
+    lines = [TextLine(text, spans, width) for spans, width in _break_lines(text, font, max_width)]
+    return TextLayout(text, font, lines, _line_height(font.path, font.size) + line_spacing_add)
+
+
+def _fits(text, font_path, size, max_width, max_height, line_spacing_add):
+    font = get_font(font_path, size)
+    line_h = _line_height(font_path, size) + line_spacing_add
+    height = 0
+    for _, width in _break_lines(text, font, max_width):
+        height += line_h
+        if width > max_width or height > max_height:
+            return False
+    return True
+
+
+def fit_text(text, font_path, max_width, max_height, min_size, max_size, line_spacing_add=0):
+    # Binary-search the largest font size whose wrapped text fits the box; the
+    # probes only count lines, the layout is built once for the chosen size
+    lo, hi = min_size, max_size
+    best = min_size
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if _fits(text, font_path, mid, max_width, max_height, line_spacing_add):
+            best = mid
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    return wrap_text(text, get_font(font_path, best), max_width, line_spacing_add)
+
+
+def _line_runs(text, spans, colors):
+    # Group a line's words into runs of one colour straight from the colour
+    # spans; the space between two words joins the run before it, so a
+    # single-colour line is a single run
+    runs = []
+    for i, (start, end) in enumerate(spans):
+        if i:
+            runs[-1][0] += ' '
+        for run_start, run_end, c in colors.runs(start, end):
+            if runs and runs[-1][1] == c:
+                runs[-1][0] += text[run_start:run_end]
+            else:
+                runs.append([text[run_start:run_end], c])
+    return runs
+
+
+def _start_y(layout, y, max_height):
+    # Lines are centred vertically in the box, but never start above it
+    return y + max(0, (max_height - layout.height)//2)
+
+
+def layout_bbox(layout, position, max_width, max_height):
+    # Conservative pixel box of everything draw_layout paints: the union of
+    # each line's ink box, which unlike the font's ascent and descent also
+    # covers marks drawn below the baseline (Bangla vowel signs), padded for
+    # lines drawn as several colour runs; None when there is nothing to draw
+    if not layout.lines:
+        return None
+    font = layout.font
+    x, y = position
+    line_y = _start_y(layout, y, max_height)
+    ascent, descent = font.getmetrics()
+    pad = font.size // 8 + 2
+    left = top = float("inf")
+    right = bottom = float("-inf")
+    for line in layout.lines:
+        line_x = x + (max_width - line.width)//2
+        ink = _run_ink(font.path, font.size, line.text)
+        left = min(left, line_x + min(0, ink[0]))
+        right = max(right, line_x + max(line.width, ink[2]))
+        top = min(top, line_y + min(0, ink[1]))
+        bottom = max(bottom, line_y + max(ascent + descent, ink[3]))
+        line_y += layout.line_height
+    return (int(left) - pad, int(top) - pad, int(right) + pad + 1, int(bottom) + pad + 1)
+
+
+def draw_layout(draw, layout, position, max_width, max_height, colors):
+    font = layout.font
+    x, y = position
+    start_y = _start_y(layout, y, max_height)
+
+    for line in layout.lines:
+        runs = _line_runs(layout.text, line.spans, colors)
+        cur_x = x + (max_width - line.width)//2
+        for run, c in runs:
+            draw.text((cur_x, start_y), run, font=font, fill=c)
+            cur_x += text_advance(font, run)
+        start_y += layout.line_height
+
+
+def draw_multicolor_text(draw, position, text, font, colors, max_width, max_height, line_spacing_add=0):
+    layout = wrap_text(text, font, max_width, line_spacing_add)
+    draw_layout(draw, layout, position, max_width, max_height, colors)